@@ -8,8 +8,18 @@
 from __future__ import annotations
 
 import os
+import queue
+import re
+import sys
+import threading
 import time
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
+
+from utils.timer import PomodoroTimer
+from utils.workers import CameraThread, VoiceThread
 
 # ---------- Optional deps (fail-safe imports) ----------
 try:
@@ -20,7 +30,7 @@ except Exception:
 # --- utils.voice ---
 # Expecting either:
 #   from utils.voice import try_listen
-# or a class VoiceRecognizer with .listen_once()
+# or a class VoiceRecognizer (background listener polled with .get())
 try:
     from utils.voice import try_listen as _try_listen  # preferred
     HAVE_TRY_LISTEN = True
@@ -31,12 +41,18 @@ except Exception:
         from utils.voice import VoiceRecognizer  # fallback
     except Exception:
         VoiceRecognizer = None  # type: ignore
+try:
+    from utils.voice import calibrate as _calibrate_mic
+except Exception:
+    _calibrate_mic = None
 
 # --- utils.sound (optional TTS) ---
 try:
-    from utils.sound import say as _say
+    from utils.sound import say as _say, say_stream as _say_stream, warmup as _tts_warmup
 except Exception:
     _say = None
+    _say_stream = None
+    _tts_warmup = None
 
 # --- utils.vision (optional face detect) ---
 try:
@@ -46,27 +62,58 @@ except Exception:
 
 # --- utils.emotion (optional face -> emotion) ---
 try:
-    from utils.emotion import estimate_emotion_from_face
+    from utils.emotion import estimate_emotion_from_face, estimate_emotion_from_face_batch
 except Exception:
     estimate_emotion_from_face = None
+    estimate_emotion_from_face_batch = None
 
 # --- utils.ai (optional LLM responder) ---
 # We support either a simple helper class AIResponder with .reply(ctx, user_text)
-# or we’ll build an inline OpenAI call.
-AIResponder = None
+# or we’ll build an inline OpenAI call. Both pull in the openai package
+# (httpx, pydantic, ...), so they are only imported in _build_ai() once a
+# key is known to exist.
+
+# --- utils.cache (optional semantic reply cache, needs numpy) ---
 try:
-    from utils.ai import AIResponder  # type: ignore
+    from utils.cache import SemanticCache, openai_embedder
 except Exception:
-    AIResponder = None  # type: ignore
+    SemanticCache = None  # type: ignore
+
+# Camera preview window; off by default (headless Pi). AI_MIRROR_PREVIEW=1 to show it.
+SHOW_PREVIEW = os.getenv("AI_MIRROR_PREVIEW", "0") == "1"
+
+_DIGITS_RE = re.compile(r"\d+")
+
+# Utterances that arrive in a burst (the voice thread keeps queueing while a
+# reply is being spoken) are answered with one reply_batched request: after
+# taking an utterance the loop waits up to BATCH_WINDOW seconds for more.
+BATCH_WINDOW = 0.25
+BATCH_MAX = 8
+
+# Face detection runs on a downscaled copy of each frame
+DETECT_SCALE = 0.5
+MAX_FACES = 4  # faces classified per frame (one batched emotion call)
+# Mean abs difference (0..255) of a 32x32 gray thumbnail below which the
+# scene is treated as unchanged and the previous mood is reused
+SCENE_DIFF_THRESHOLD = 3.0
+
+# Vision runs off the main loop as two pipelined stages: while the emotion
+# model classifies frame N, detection already runs on frame N+1 (OpenCV and
+# the model runtimes release the GIL). At most one job per stage is in
+# flight, so each stage's module-level state is never used concurrently.
+_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vision")
+
+_VR = None  # fallback VoiceRecognizer, started on first use and kept listening
 
 # ---------- Small helpers ----------
 
 def say(text: str) -> None:
     """Speak (if TTS available) and always print as console output."""
-    print(f"[TTS] {text}")
+    if not _say:
+        print(f"[TTS] {text}")
+        return
     try:
-        if _say:
-            _say(text)
+        _say(text)  # utils.sound.say prints the [TTS] line itself
     except Exception:
         # Never break the app on TTS failure
         pass
@@ -78,6 +125,7 @@ def try_listen(timeout: float = 6.0, culture: str = "en-US", phrase_time_limit:
     `utils.voice.try_listen` or only `VoiceRecognizer`.
     Returns: str | None
     """
+    global _VR
     # Preferred: project-level function
     if HAVE_TRY_LISTEN and _try_listen:
         try:
@@ -85,11 +133,12 @@ def try_listen(timeout: float = 6.0, culture: str = "en-US", phrase_time_limit:
         except Exception:
             return None
 
-    # Fallback: local recognizer
+    # Fallback: one background recognizer for the whole process, polled here
     if VoiceRecognizer is not None:
         try:
-            vr = VoiceRecognizer(culture=culture)
-            return vr.listen_once(timeout=timeout, phrase_time_limit=phrase_time_limit)
+            if _VR is None:
+                _VR = VoiceRecognizer(culture=culture, phrase_time_limit=phrase_time_limit)
+            return _VR.get(timeout=timeout)
         except Exception:
             return None
 
@@ -105,6 +154,9 @@ def _open_camera() -> "cv2.VideoCapture | None":
         cap = cv2.VideoCapture(0, cv2.CAP_DSHOW) if hasattr(cv2, "CAP_DSHOW") else cv2.VideoCapture(0)
         if not cap or not cap.isOpened():
             return None
+        # MJPG is native on most USB cams (less bus/driver conversion work)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FPS, 30)
         # modest resolution keeps CPU/GPU low
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
@@ -113,79 +165,193 @@ def _open_camera() -> "cv2.VideoCapture | None":
         return None
 
 
-def _read_frame(cap) -> "tuple | None":
-    if cv2 is None or cap is None:
-        return None
-    ok, frame = cap.read()
-    if not ok or frame is None:
-        return None
-    return frame
-
-
-def _emotion_from_frame(frame) -> str | None:
-    """Return coarse emotion string or None if unavailable."""
+def _faces_in(frame) -> list:
+    """Face boxes to classify, largest first (at most MAX_FACES); [] if unavailable."""
     if frame is None or cv2 is None:
-        return None
+        return []
     if detect_faces_fast is None or estimate_emotion_from_face is None:
+        return []
+    try:
+        # numpy in: only the Haar pass uploads to the device (YuNet and ROI tracking run on the host)
+        faces = detect_faces_fast(frame, detect_scale=DETECT_SCALE)
+        # Largest face first; it is the one we report
+        return sorted(faces, key=lambda r: r[2] * r[3], reverse=True)[:MAX_FACES]
+    except Exception:
+        return []
+
+
+def _emotion_for(frame, faces) -> str | None:
+    """Coarse emotion of the first (largest) face, or None."""
+    if not faces:
         return None
     try:
-        # detect face(s)
-        faces = detect_faces_fast(frame)
-        if not faces:
-            return None
-        # Use the largest face
-        x, y, w, h = max(faces, key=lambda r: r[2] * r[3])
-        face_bgr = frame[y : y + h, x : x + w]
-        emotion = estimate_emotion_from_face(face_bgr)  # returns e.g. 'happy', 'sad', ...
-        return emotion
+        crops = [frame[y : y + h, x : x + w] for (x, y, w, h) in faces]
+        if estimate_emotion_from_face_batch is not None:
+            # one model call for every face in view
+            emotions = estimate_emotion_from_face_batch(crops)  # e.g. ['happy', 'sad', ...]
+        else:
+            emotions = [estimate_emotion_from_face(crops[0])]
+        return emotions[0]
     except Exception:
         return None
 
 
+# Persona for the inline responder. Keep it byte-identical between calls:
+# OpenAI only discounts (and skips prefill for) an unchanged request prefix.
+INLINE_SYSTEM = (
+    "You are the voice of a smart mirror. Keep replies short, friendly, and helpful."
+)
+SUMMARY_EVERY = 6  # ctx entries (user/assistant) folded into the summary at a time
+CONTEXT_TOKENS = 512  # budget for verbatim turns sent with each request
+MAX_PENDING = 4 * SUMMARY_EVERY  # hard cap if summaries keep failing
+
+
+def _token_counter():
+    """Return text -> token count; tiktoken if installed, else a ~4 chars/token estimate."""
+    try:
+        import tiktoken  # type: ignore
+        enc = tiktoken.encoding_for_model("gpt-4o-mini")
+        return lambda text: len(enc.encode(text))
+    except Exception:
+        return lambda text: max(1, len(text) // 4)
+
+
+class InlineResponder:
+    """
+    Direct OpenAI chat responder used when utils.ai isn't available.
+    Request layout: persona, rolling summary, verbatim recent turns, new turn.
+    Between summary updates each request only appends to the previous one,
+    so the prefix stays eligible for provider-side prompt caching.
+    """
+
+    def __init__(self, client, model="gpt-4o-mini"):
+        self.client = client
+        self.model = model
+        self._cache = SemanticCache(openai_embedder(client)) if SemanticCache else None
+        # chat requests run here so the cache lookup (an embeddings call) overlaps them
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat")
+        self._lock = threading.Lock()
+        self._summary = ""
+        # (message, token count) not yet summarized, oldest first; each turn is
+        # tokenized once when it is added, never again per request
+        self._turns: list[tuple[dict, int]] = []
+        self._count_tokens = _token_counter()
+        self._summarizing = False
+
+    def _overflow(self) -> int:
+        """Number of oldest turns that don't fit in CONTEXT_TOKENS (caller holds the lock)."""
+        total = 0
+        for i in range(len(self._turns) - 1, -1, -1):
+            total += self._turns[i][1]
+            if total > CONTEXT_TOKENS:
+                return i + 1
+        return 0
+
+    def _messages(self, user_text: str) -> list[dict]:
+        messages = [{"role": "system", "content": INLINE_SYSTEM}]
+        with self._lock:
+            if self._summary:
+                messages.append({"role": "system", "content": "Conversation so far: " + self._summary})
+            messages.extend(m for m, _ in self._turns[self._overflow():])
+        messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def _remember(self, user_text: str, reply: str) -> None:
+        with self._lock:
+            for role, text in (("user", user_text), ("assistant", reply)):
+                self._turns.append(({"role": role, "content": text}, self._count_tokens(text)))
+            del self._turns[:-MAX_PENDING]
+            if self._summarizing:
+                return
+            # fold whatever no longer fits the token budget, or the oldest
+            # SUMMARY_EVERY once enough turns are pending (keeping that many verbatim)
+            n = self._overflow()
+            if len(self._turns) >= 2 * SUMMARY_EVERY:
+                n = max(n, SUMMARY_EVERY)
+            if not n:
+                return
+            self._summarizing = True
+            oldest = self._turns[:n]
+            summary = self._summary
+        threading.Thread(target=self._summarize, args=(summary, oldest), daemon=True).start()
+
+    def _summarize(self, summary: str, oldest: list[tuple[dict, int]]) -> None:
+        """Fold the oldest turns into the rolling summary (runs in the background)."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m, _ in oldest)
+        if summary:
+            transcript = f"Previous summary: {summary}\n{transcript}"
+        new_summary = None
+        try:
+            resp = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": (
+                        "Summarize this smart-mirror conversation in under 150 words. "
+                        "Keep facts the user shared and anything still unanswered."
+                    )},
+                    {"role": "user", "content": transcript},
+                ],
+                temperature=0.2,
+                max_tokens=200,
+            )
+            new_summary = (resp.choices[0].message.content or "").strip()
+        except Exception as e:
+            print("[AI] Summary error:", repr(e))
+
+        with self._lock:
+            if new_summary:
+                self._summary = new_summary
+                folded = {id(t) for t in oldest}
+                self._turns = [t for t in self._turns if id(t) not in folded]
+            self._summarizing = False
+
+    def reply(self, ctx: list[str], user_text: str) -> str:
+        # only reuse an answer given right after the same previous user turn
+        chain = ctx[-2] if len(ctx) >= 2 else None
+        answer = self._pool.submit(
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=self._messages(user_text),
+            temperature=0.6,
+            max_tokens=120,
+        )
+        qvec = None
+        if self._cache is not None:
+            cached, qvec = self._cache.lookup(user_text, context=chain)
+            if cached:
+                self._remember(user_text, cached)
+                return cached  # the chat answer still in flight is discarded
+
+        resp = answer.result()
+        reply = (resp.choices[0].message.content or "").strip()
+        self._remember(user_text, reply)
+        if self._cache is not None:
+            self._cache.put(user_text, reply, context=chain, vec=qvec)
+        return reply
+
+
 def _build_ai():
     """
     Make an AI responder, first trying project-level utils.ai.AIResponder.
     Otherwise use openai directly, only if OPENAI_API_KEY looks present.
     """
     api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY".lower())
-    if AIResponder is not None and api_key:
-        try:
-            return AIResponder(model="gpt-4o-mini")
-        except Exception:
-            pass
+    if not api_key:
+        # No online AI available; skip the (slow) openai import entirely
+        return None
 
-    # Inline OpenAI fallback:
-    if api_key:
-        try:
-            from openai import OpenAI  # type: ignore
-            client = OpenAI(api_key=api_key)
-
-            class InlineResponder:
-                def __init__(self, model="gpt-4o-mini"):
-                    self.model = model
-
-                def reply(self, ctx: list[str], user_text: str) -> str:
-                    system_text = (
-                        "You are the voice of a smart mirror. Keep replies short, friendly, and helpful."
-                    )
-                    messages = [{"role": "system", "content": system_text}]
-                    for u in ctx[-6:]:  # shallow memory
-                        messages.append({"role": "user", "content": u})
-                    messages.append({"role": "user", "content": user_text})
-                    resp = client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=0.6,
-                        max_tokens=120,
-                    )
-                    return (resp.choices[0].message.content or "").strip()
-
-            return InlineResponder()
-        except Exception:
-            pass
+    try:
+        from utils.ai import AIResponder  # type: ignore
+        return AIResponder(model="gpt-4o-mini")
+    except Exception:
+        pass
 
-    # No online AI available
-    return None
+    # Inline OpenAI fallback:
+    try:
+        from utils.openai_client import get_client
+        return InlineResponder(get_client(api_key))
+    except Exception:
+        return None
 
 
 def _offline_answer(user: str, mood: str | None) -> str:
@@ -206,6 +372,14 @@ def _offline_answer(user: str, mood: str | None) -> str:
     return "Okay."
 
 
+def _is_command(lower: str) -> bool:
+    """True for utterances handled by AIMirror.run's command branch (never batched)."""
+    s = lower.strip()
+    return ("quit" in lower or "goodbye" in lower or s in ("mute", "unmute")
+            or lower.startswith("start timer") or "pause timer" in lower
+            or "resume timer" in lower or "status" in lower)
+
+
 # ---------- The App ----------
 
 class AIMirror:
@@ -213,9 +387,50 @@ class AIMirror:
         self.model_name = "gpt-4o-mini"
         self.ctx: deque[str] = deque(maxlen=12)
         self.cap = _open_camera()
+        if _tts_warmup is not None:
+            # TTS connection in the background while vision warms up. Off the
+            # main thread warmup() only imports the SAPI driver and opens the
+            # online connection; the pyttsx3 engine itself is built on first use.
+            threading.Thread(target=_tts_warmup, daemon=True).start()
+        self._warm_up()
         self.ai = _build_ai()
         self.muted = False
         self.moods = deque(maxlen=12)
+        self._last_thumb = None
+        self._faces_job: Future | None = None
+        self._emotion_job: Future | None = None
+        self.stop = threading.Event()
+        self.audio_q: queue.Queue[str] = queue.Queue(maxsize=4)
+        self._backlog: deque[str] = deque()  # drained by _burst() but not handled yet
+        self.cam = CameraThread(self.cap, self.stop) if self.cap is not None else None
+        self.voice = VoiceThread(self._listen, self.audio_q, self.stop)
+        # voice timer runs on its own thread; it only flags completion and
+        # the main loop does the talking
+        self.timer_done = threading.Event()
+        self.timer = PomodoroTimer(on_done=self.timer_done.set)
+        if _calibrate_mic is not None:
+            # ambient-noise calibration once, before the first prompt
+            _calibrate_mic()
+
+    def _warm_up(self) -> None:
+        """Run one dummy detection/emotion pass so lazy init isn't paid on the first real turn."""
+        try:
+            import numpy as np
+        except Exception:
+            return
+        t0 = time.monotonic()
+        try:
+            if detect_faces_fast is not None:
+                detect_faces_fast(np.zeros((360, 640, 3), np.uint8), detect_scale=DETECT_SCALE)
+            if estimate_emotion_from_face is not None:
+                # remember=False: the dummy's label must not be reused for a real face
+                try:
+                    estimate_emotion_from_face(np.zeros((64, 64, 3), np.uint8), remember=False)
+                except TypeError:  # older utils.emotion without the flag
+                    estimate_emotion_from_face(np.zeros((64, 64, 3), np.uint8))
+        except Exception:
+            return
+        print(f"[INFO] Vision warm-up took {time.monotonic() - t0:.2f}s")
 
     # --------- basic voice I/O ----------
     def _listen(self) -> str | None:
@@ -228,10 +443,80 @@ class AIMirror:
 
     def _speak(self, text: str) -> None:
         if not self.muted:
-            say(text)
+            # don't let the mic thread transcribe our own voice
+            with self.voice.paused():
+                say(text)
         else:
             print(f"[TTS muted] {text}")
 
+    def _next_utterance(self, timeout: float) -> str:
+        """Oldest unhandled utterance; raises queue.Empty after timeout."""
+        if self._backlog:
+            return self._backlog.popleft()
+        return self.audio_q.get(timeout=timeout)
+
+    def _burst(self) -> list[str]:
+        """
+        Follow-up utterances arriving within BATCH_WINDOW (at most BATCH_MAX - 1).
+        Stops at a command, which is kept for the next loop iteration.
+        """
+        more: list[str] = []
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(more) < BATCH_MAX - 1:
+            try:
+                text = self._next_utterance(max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if _is_command(text.lower()):
+                self._backlog.appendleft(text)
+                break
+            more.append(text)
+        return more
+
+    # --------- vision ----------
+    def _faces_for(self, frame):
+        """
+        Detection stage (pool thread). Returns (frame, faces), or None when the
+        frame barely differs from the one last analysed (the mood stays as is).
+        """
+        try:
+            # shrink first, then gray: the full-size gray is only built by the Haar pass
+            thumb = cv2.cvtColor(cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA),
+                                 cv2.COLOR_BGR2GRAY)
+            last = self._last_thumb
+            if last is not None and cv2.mean(cv2.absdiff(thumb, last))[0] < SCENE_DIFF_THRESHOLD:
+                return None
+            self._last_thumb = thumb
+        except Exception:
+            pass
+        return frame, _faces_in(frame)
+
+    def _vision_step(self, frame, mood):
+        """Advance the detect -> emotion pipeline without blocking; returns the current mood."""
+        if self._faces_job is None or self._faces_job.done():
+            found = None
+            if self._faces_job is not None:
+                try:
+                    found = self._faces_job.result()
+                except Exception:
+                    found = None
+            self._faces_job = _POOL.submit(self._faces_for, frame)  # next frame, right away
+            if found is not None:
+                if not found[1]:
+                    mood = None
+                elif self._emotion_job is None:
+                    self._emotion_job = _POOL.submit(_emotion_for, *found)
+        if self._emotion_job is not None and self._emotion_job.done():
+            try:
+                mood = self._emotion_job.result()
+            except Exception:
+                mood = None
+            self._emotion_job = None
+            if mood:
+                self.moods.append(mood)
+                print("[MOOD]", mood)
+        return mood
+
     # --------- main loop ----------
     def run(self):
         # Banner
@@ -246,47 +531,46 @@ class AIMirror:
               "Voice: say 'mute', 'unmute', 'start timer 25', 'pause timer', "
               "'resume timer', 'status', 'quit'.")
 
-        timer_deadline = None
-        paused = False
-
-        while True:
-            # ---- camera + emotion (non-blocking) ----
-            mood = None
-            if self.cap is not None:
-                frame = _read_frame(self.cap)
-                if frame is not None:
-                    mood = _emotion_from_frame(frame)
-                    if mood:
-                        self.moods.append(mood)
-                        print("[MOOD]", mood)
-
-                    # optional preview & quit by 'q'
-                    if cv2 is not None:
-                        try:
-                            cv2.imshow("AI Mirror Camera (press Q to close)", frame)
-                            if cv2.waitKey(1) & 0xFF == ord('q'):
-                                self._speak("Goodbye.")
-                                break
-                        except Exception:
-                            pass
+        mood = None
+
+        if self.cam is not None:
+            self.cam.start()
+        self.voice.start()
+
+        while not self.stop.is_set():
+            # ---- camera + emotion (newest frame only, never blocks) ----
+            frame = self.cam.get_latest() if self.cam is not None else None
+            if frame is not None:
+                mood = self._vision_step(frame, mood)
+
+                # optional preview & quit by 'q' (GUI calls stay on the main thread)
+                if SHOW_PREVIEW and cv2 is not None:
+                    try:
+                        cv2.imshow("AI Mirror Camera (press Q to close)", frame)
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            self._speak("Goodbye.")
+                            self.stop.set()
+                            continue
+                    except Exception:
+                        pass
 
             # ---- status updates (timer) ----
-            if timer_deadline and not paused:
-                if time.time() >= timer_deadline:
-                    self._speak("Timer done.")
-                    timer_deadline = None
-
-            # ---- prompt user ----
-            self._speak("Say something! (Speak clearly for ~5 seconds...)")
-            user = self._listen()
-            if not user:
+            if self.timer_done.is_set():
+                self.timer_done.clear()
+                self._speak("Timer done.")
+
+            # ---- next utterance from the voice thread ----
+            try:
+                user = self._next_utterance(timeout=0.05)
+            except queue.Empty:
                 continue
             lower = user.lower()
 
             # ---- commands ----
             if "quit" in lower or "goodbye" in lower:
                 self._speak("Goodbye.")
-                break
+                self.stop.set()  # stops the camera/voice threads and this loop
+                continue
 
             if "mute" == lower.strip():
                 self.muted = True
@@ -301,25 +585,29 @@ class AIMirror:
             if lower.startswith("start timer"):
                 # crude minutes/seconds parser: "start timer 25" -> 25 seconds
                 try:
-                    n = int("".join([c for c in lower if c.isdigit()]) or "25")
-                    timer_deadline = time.time() + n
-                    paused = False
+                    m = _DIGITS_RE.search(lower)
+                    n = int(m.group()) if m else 25
+                    # replace any running timer
+                    self.timer.stop()
+                    self.timer_done.clear()
+                    self.timer = PomodoroTimer(on_done=self.timer_done.set)
+                    self.timer.start(work_min=n / 60, cycles=1)
                     self._speak(f"Timer set for {n} seconds.")
                 except Exception:
                     self._speak("Couldn't set the timer.")
                 continue
 
             if "pause timer" in lower:
-                if timer_deadline:
-                    paused = True
+                if self.timer.is_running() and not self.timer.status()["paused"]:
+                    self.timer.pause()
                     self._speak("Timer paused.")
                 else:
                     self._speak("No running timer.")
                 continue
 
             if "resume timer" in lower:
-                if timer_deadline and paused:
-                    paused = False
+                if self.timer.is_running() and self.timer.status()["paused"]:
+                    self.timer.resume()
                     self._speak("Timer resumed.")
                 else:
                     self._speak("No paused timer.")
@@ -334,10 +622,40 @@ class AIMirror:
                 continue
 
             # ---- AI / offline reply ----
+            burst = self._burst() if self.ai is not None and hasattr(self.ai, "reply_batched") else []
+            if burst:
+                # several utterances in a row: one request answers them all
+                texts = [user] + burst
+                try:
+                    replies = self.ai.reply_batched(texts, {"emotion": mood})
+                except Exception:
+                    replies = [None] * len(texts)
+                for text, reply in zip(texts, replies):
+                    reply = reply or _offline_answer(text, mood)
+                    self.ctx.append(text)
+                    self.ctx.append(reply)
+                    self._speak(reply)
+                continue
+
             reply = None
-            if self.ai is not None:
+            if (self.ai is not None and hasattr(self.ai, "reply_stream")
+                    and _say_stream and not self.muted):
+                # speak each sentence as soon as the model has produced it
+                try:
+                    with self.voice.paused():
+                        reply = _say_stream(self.ai.reply_stream(user, {"emotion": mood})) or None
+                except Exception:
+                    reply = None
+                if reply is not None:
+                    self.ctx.append(user)
+                    self.ctx.append(reply)
+                    continue
+            elif self.ai is not None:
                 try:
-                    reply = self.ai.reply(list(self.ctx), user)
+                    if isinstance(self.ai, InlineResponder):
+                        reply = self.ai.reply(list(self.ctx), user)
+                    else:
+                        reply = self.ai.reply(user, {"emotion": mood})  # utils.ai.AIResponder
                 except TypeError:
                     # Some older utils.ai versions used (user_text) only
                     reply = self.ai.reply(user)  # type: ignore
@@ -352,10 +670,16 @@ class AIMirror:
             self._speak(reply)
 
         # ---- cleanup ----
+        self.stop.set()
+        self.timer.stop()
+        _POOL.shutdown(wait=True, cancel_futures=True)
+        if self.cam is not None:
+            self.cam.join(timeout=1.0)
         if self.cap is not None and cv2 is not None:
             try:
                 self.cap.release()
-                cv2.destroyAllWindows()
+                if SHOW_PREVIEW:
+                    cv2.destroyAllWindows()
             except Exception:
                 pass
 
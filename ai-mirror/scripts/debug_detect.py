@@ -1,28 +1,20 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
 import cv2, time
-from utils.vision import detect_faces_fast
+from utils.vision import detect_faces_fast, as_umat, LabelOverlay
 
-# Try DirectShow first (stable on many Windows setups). If it fails, switch to MSMF.
-def open_cam(index=0):
-    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-    if not cap.isOpened():
-        cap.release()
-        cap = cv2.VideoCapture(index, cv2.CAP_MSMF)
-    return cap
+from utils.camera import BACKENDS, open_cam
 
-for cam_index in (0, 1, 2):
-    cap = open_cam(cam_index)
-    print(f"[INFO] Trying camera index {cam_index} ... opened={cap.isOpened()}")
-    if cap.isOpened():
-        break
-
-if not cap or not cap.isOpened():
+# DirectShow first (stable on many Windows setups), then MSMF; indices 0-2 in parallel
+cap, cam_index, backend = open_cam((0, 1, 2), BACKENDS[:2])
+if cap is None:
     raise RuntimeError("No camera opened. Try unplug/replug, different USB port, or close other camera apps.")
+print(f"[INFO] Using camera index {cam_index} ({backend})")
 
 cv2.namedWindow("Debug Detect", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Debug Detect", 960, 540)
 print("[INFO] Press 'q' to quit.")
+label = LabelOverlay(scale=1, color=(0, 255, 0))
 
 while True:
     ok, frame = cap.read()
@@ -31,14 +23,16 @@ while True:
         time.sleep(0.05)
         continue
 
-    boxes = detect_faces_fast(frame, detect_scale=0.9)
-    for (t, r, b, l) in boxes:
-        cv2.rectangle(frame, (l, t), (r, b), (0, 255, 0), 2)
-
-    cv2.putText(frame, f"faces: {len(boxes)}", (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+    # detection takes the numpy frame (only its Haar pass uploads)
+    boxes = detect_faces_fast(frame, detect_scale=0.5)
+    view = as_umat(frame)  # OpenCL for drawing when available
+    if boxes:
+        for (x, y, w, h) in boxes:
+            cv2.rectangle(view, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        # cached label; re-rendered at most once a second
+        label.draw(view, f"faces: {len(boxes)}")
 
-    cv2.imshow("Debug Detect", frame)
+    cv2.imshow("Debug Detect", view)
     key = cv2.waitKey(1) & 0xFF
     if key == ord('q'):
         break
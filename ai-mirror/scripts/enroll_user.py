@@ -2,16 +2,14 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
 import os, cv2, argparse, time
 from utils.vision import detect_faces_fast, crop_gray
+from utils import camera
 
 def open_cam(index: int):
-    # Try DirectShow first (often best on Windows), then MSMF
-    for name, flag in (("CAP_DSHOW", cv2.CAP_DSHOW), ("CAP_MSMF", cv2.CAP_MSMF), ("CAP_ANY", cv2.CAP_ANY)):
-        cap = cv2.VideoCapture(index, flag)
-        if cap.isOpened():
-            print(f"[INFO] Opened camera {index} with {name}", flush=True)
-            return cap
-        cap.release()
-    return None
+    # Try DirectShow first (often best on Windows), then MSMF, then any
+    cap, _, name = camera.open_cam((index,))
+    if cap is not None:
+        print(f"[INFO] Opened camera {index} with {name}", flush=True)
+    return cap
 
 def main():
     ap = argparse.ArgumentParser()
@@ -0,0 +1,36 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
+# One-time export of FER's Keras emotion classifier to an INT8 ONNX model
+# for utils/emotion.py (onnxruntime instead of TensorFlow at runtime).
+#   pip install fer==22.4.0 tf2onnx onnxruntime
+#   python scripts/export_fer_onnx.py
+import argparse
+
+from utils.emotion import FER_ONNX
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=FER_ONNX, help="INT8 model path")
+    ap.add_argument("--opset", type=int, default=13)
+    args = ap.parse_args()
+
+    import fer
+    import tensorflow as tf
+    import tf2onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    src = os.path.join(os.path.dirname(fer.__file__), "data", "emotion_model.hdf5")
+    model = tf.keras.models.load_model(src, compile=False)
+    _, h, w, c = model.input_shape
+    print(f"[INFO] {src}: input {h}x{w}x{c}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    fp32 = os.path.splitext(args.out)[0] + "_fp32.onnx"
+    spec = (tf.TensorSpec((None, h, w, c), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=args.opset, output_path=fp32)
+    quantize_dynamic(fp32, args.out, weight_type=QuantType.QInt8)
+    os.remove(fp32)
+    print(f"[OK] Saved {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,160 @@
 # main_pi.py  — Windows-friendly Jarvis-like assistant
 
-import os, time, queue, io, tempfile
+import sys, os, time, queue, io, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
 import numpy as np
 import cv2
 
-from openai import OpenAI
-import simpleaudio as sa
+from utils.workers import CameraThread, VoiceThread
+from utils.cache import SemanticCache, openai_embedder
+from utils.vision import to_gray, load_yunet, yunet_boxes, as_umat, to_host, LabelOverlay
+from utils.openai_client import get_client
+from utils.sound import TTS_RATE, say_online, tts_response
+
+try:
+    import simpleaudio as sa  # TTS playback when sounddevice is missing
+except Exception:
+    sa = None
 
 USE_SOUNDDEVICE = False  # set True if PyAudio fails to install
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 
 try:
     import speech_recognition as sr
+    from utils.stt import recognize
     R_HAS = True
 except Exception:
     R_HAS = False
 
-if USE_SOUNDDEVICE:
-    import sounddevice as sd
-    import soundfile as sf
+try:
+    import sounddevice as sd  # streamed TTS playback (and the recording fallback)
+except Exception:
+    sd = None
+
+def _openai():
+    """Shared OpenAI client, imported on first use (the import is slow on a Pi)."""
+    return get_client(OPENAI_API_KEY)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+TIP_COOLDOWN = 60.0  # seconds between spoken mood tips
+# Camera preview window; off by default (headless Pi). AI_MIRROR_PREVIEW=1 to show it.
+SHOW_PREVIEW = os.getenv("AI_MIRROR_PREVIEW", "0") == "1"
 
-def say(text: str) -> None:
+# near-duplicate questions in the same mood reuse the previous answer
+_REPLY_CACHE = SemanticCache(openai_embedder(_openai())) if OPENAI_API_KEY else None
+# the chat request runs here while the cache lookup (an embeddings call) runs on the caller
+_CHAT_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat")
+
+# Load the face cascade once; parsing the XML per frame is expensive on a Pi
+_FACE_CASCADE = cv2.CascadeClassifier(
+    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+)
+assert not _FACE_CASCADE.empty(), "Could not load haarcascade_frontalface_default.xml"
+DETECT_SCALE = 0.5  # run the detector on a half-size image
+# INT8 YuNet if models/face_detection_yunet_2023mar_int8.onnx is present, else Haar
+_YUNET = load_yunet()
+
+_TTS_Q = queue.Queue()  # (text, on_done, done); one worker plays them in call order
+_TTS_WORKER = None
+
+def _play_tts(text):
+    """Stream PCM from OpenAI TTS straight to the speaker as chunks arrive."""
+    if sd is not None:
+        say_online(text)  # utils.sound: chunks go into a RawOutputStream as they arrive
+    elif sa is not None:
+        # no sounddevice: play the raw PCM buffer in one go
+        with tts_response(text) as resp:
+            sa.play_buffer(resp.read(), 1, 2, TTS_RATE).wait_done()
+    else:
+        print("[TTS] No sounddevice or simpleaudio. Skipping voice output.")
+
+def _tts_worker():
+    while True:
+        text, on_done, done = _TTS_Q.get()
+        try:
+            _play_tts(text)
+        except Exception as e:
+            print(f"[TTS] Error: {e}")
+        finally:
+            if on_done:
+                on_done()
+            done.set()
+
+def say(text: str, on_done=None):
+    """
+    Queue text for the playback worker; returns an Event set when it has been
+    spoken (or None). on_done() runs once playback has finished or failed.
+    """
+    global _TTS_WORKER
     print(f"[TTS] {text}")
     if not OPENAI_API_KEY:
         print("[TTS] No OPENAI_API_KEY. Skipping voice output.")
-        return
-    try:
-        # TTS to a WAV in memory, then play with simpleaudio
-        resp = client.audio.speech.create(
-            model="tts-1",
-            voice="alloy",
-            input=text
-        )
-        audio_bytes = resp.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-            f.write(audio_bytes)
-            tmp = f.name
-        wav = sa.WaveObject.from_wave_file(tmp)
-        play = wav.play()
-        play.wait_done()
-        try:
-            os.remove(tmp)
-        except Exception:
-            pass
-    except Exception as e:
-        print(f"[TTS] Error: {e}")
+        if on_done:
+            on_done()
+        return None
+    if _TTS_WORKER is None:
+        _TTS_WORKER = threading.Thread(target=_tts_worker, name="tts", daemon=True)
+        _TTS_WORKER.start()
+    done = threading.Event()
+    _TTS_Q.put((text, on_done, done))
+    return done
+
+MIC_RATE = 16000   # sounddevice capture rate
+MIC_BLOCK = 1024   # frames per mic read (~64 ms at 16 kHz)
+SILENCE_S = 0.6    # quiet this long after speech ends the phrase
+
+_recognizer = None      # shared across calls so calibration happens once
+_vad_threshold = None   # RMS level for the sounddevice path, calibrated once
+
+def _get_recognizer(device_index=None):
+    global _recognizer
+    if _recognizer is None:
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = True  # keeps adapting after the first calibration
+        if not USE_SOUNDDEVICE:
+            with sr.Microphone(device_index=device_index, chunk_size=MIC_BLOCK) as source:
+                r.adjust_for_ambient_noise(source, duration=0.6)
+        _recognizer = r
+    return _recognizer
+
+def _rms(block) -> float:
+    return float(np.sqrt(np.mean(block.astype(np.float32) ** 2)))
+
+def _record_until_silence(timeout, phrase_time_limit):
+    """
+    Read 16 kHz mono in small blocks; start on voice, stop after SILENCE_S of
+    quiet or phrase_time_limit. Returns raw int16 bytes, or None if nobody spoke.
+    """
+    global _vad_threshold
+    block_s = MIC_BLOCK / MIC_RATE
+    with sd.InputStream(samplerate=MIC_RATE, blocksize=MIC_BLOCK, channels=1, dtype="int16") as stream:
+        if _vad_threshold is None:
+            noise = [_rms(stream.read(MIC_BLOCK)[0]) for _ in range(int(0.6 / block_s))]
+            _vad_threshold = max(300.0, 2.5 * sum(noise) / len(noise))
+
+        print("[VOICE] Say something! (Speak clearly for ~5 seconds...)")
+        preroll = deque(maxlen=3)  # keep the onset of the first word
+        blocks = []
+        start = time.monotonic()
+        spoke_at = None
+        quiet = 0.0
+        while True:
+            data, _ = stream.read(MIC_BLOCK)
+            loud = _rms(data) > _vad_threshold
+            now = time.monotonic()
+            if spoke_at is None:
+                preroll.append(data.tobytes())
+                if loud:
+                    spoke_at = now
+                    blocks.extend(preroll)
+                elif now - start >= timeout:
+                    return None
+                continue
+            blocks.append(data.tobytes())
+            quiet = 0.0 if loud else quiet + block_s
+            if quiet >= SILENCE_S or now - spoke_at >= phrase_time_limit:
+                return b"".join(blocks)
 
 def listen_once(timeout=5, phrase_time_limit=6, device_index=None):
     """
@@ -58,40 +166,24 @@ def listen_once(timeout=5, phrase_time_limit=6, device_index=None):
         print("[VOICE] speech_recognition not available.")
         return None
 
-    recognizer = sr.Recognizer()
-    recognizer.dynamic_energy_threshold = True
-
     try:
+        recognizer = _get_recognizer(device_index)
         if not USE_SOUNDDEVICE:
             # Standard path (PyAudio)
-            mic = sr.Microphone(device_index=device_index)
+            mic = sr.Microphone(device_index=device_index, chunk_size=MIC_BLOCK)
             with mic as source:
-                recognizer.adjust_for_ambient_noise(source, duration=0.6)
                 print("[VOICE] Say something! (Speak clearly for ~5 seconds...)")
                 audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
         else:
             # sounddevice fallback path
-            samplerate = 16000
-            channels = 1
-            duration = min(phrase_time_limit, 6)
-            print("[VOICE] Say something! (Speak clearly for ~5 seconds...)")
-            print("[VOICE] Recording...")
-            audio_np = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=channels, dtype="int16")
-            sd.wait()
-            print("[VOICE] Recorded.")
-            # Wrap into an AudioFile for SR
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-                sf.write(f.name, audio_np, samplerate)
-                tmpwav = f.name
-            with sr.AudioFile(tmpwav) as source:
-                audio = recognizer.record(source)
-            try:
-                os.remove(tmpwav)
-            except Exception:
-                pass
+            raw = _record_until_silence(timeout, phrase_time_limit)
+            if raw is None:
+                print("[VOICE] Timeout: nothing heard.")
+                return None
+            audio = sr.AudioData(raw, MIC_RATE, 2)
 
         try:
-            text = recognizer.recognize_google(audio, language="en-US")
+            text = recognize(recognizer, audio, language="en-US")
             print(f"[VOICE] Recognized: {text}")
             return text.strip().lower()
         except sr.UnknownValueError:
@@ -104,16 +196,25 @@ def listen_once(timeout=5, phrase_time_limit=6, device_index=None):
         print(f"[VOICE] Mic error: {e}")
         return None
 
-def mood_from_face_bgr(frame_bgr):
-    """Very coarse mood by face size; replace with real classifier if needed."""
+def mood_from_face_bgr(frame_bgr, uframe=None):
+    """
+    Very coarse mood by face size; replace with real classifier if needed.
+    uframe is the frame already uploaded with as_umat (the Haar path uses it).
+    """
     try:
-        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(60, 60))
-        if len(faces) == 0:
-            return "neutral", faces
+        if _YUNET is not None:
+            # YuNet runs on the host, so resize the numpy frame there
+            small = cv2.resize(frame_bgr, None, fx=DETECT_SCALE, fy=DETECT_SCALE, interpolation=cv2.INTER_AREA)
+            found = yunet_boxes(_YUNET, small)
+        else:
+            gray = to_gray(uframe if uframe is not None else as_umat(frame_bgr))
+            small = to_host(cv2.resize(gray, None, fx=DETECT_SCALE, fy=DETECT_SCALE, interpolation=cv2.INTER_AREA))
+            found = _FACE_CASCADE.detectMultiScale(small, scaleFactor=1.2, minNeighbors=5, minSize=(30, 30))
+        if len(found) == 0:
+            return "neutral", []
+        # back to full-frame coordinates
+        inv = 1.0 / DETECT_SCALE
+        faces = [(int(x * inv), int(y * inv), int(w * inv), int(h * inv)) for (x, y, w, h) in found]
         # Just a silly proxy: bigger face -> 'happy'; few small faces -> 'neutral'
         (x, y, w, h) = max(faces, key=lambda r: r[2] * r[3])
         if w * h > 15000:
@@ -138,8 +239,11 @@ def chat_reply(user_text: str, mood: str) -> str:
         "Reply in one or two sentences, friendly and helpful. "
         f"The user's current mood is: {mood}."
     )
-    try:
-        resp = client.chat.completions.create(
+    if not OPENAI_API_KEY:
+        print("[AI] No OPENAI_API_KEY. Skipping AI reply.")
+        return "Sorry, I had trouble thinking just now."
+    def ask():
+        return _openai().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system},
@@ -148,7 +252,18 @@ def chat_reply(user_text: str, mood: str) -> str:
             temperature=0.7,
             max_tokens=90,
         )
-        return resp.choices[0].message.content.strip()
+    answer = _CHAT_POOL.submit(ask)  # errors surface from answer.result() below
+    qvec = None
+    if _REPLY_CACHE is not None:
+        cached, qvec = _REPLY_CACHE.lookup(user_text, context=mood)
+        if cached:
+            return cached  # the chat answer still in flight is discarded
+    try:
+        resp = answer.result()
+        reply = resp.choices[0].message.content.strip()
+        if _REPLY_CACHE is not None:
+            _REPLY_CACHE.put(user_text, reply, context=mood, vec=qvec)
+        return reply
     except Exception as e:
         print(f"[AI] Error: {e}")
         return "Sorry, I had trouble thinking just now."
@@ -160,47 +275,78 @@ def main():
     if not cap.isOpened():
         print("[CAM] No camera found. Running voice-only mode.")
         cap = None
+    else:
+        # MJPG is native on most USB cams (less bus/driver conversion work)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FPS, 30)
+
+    stop = threading.Event()
+    audio_q = queue.Queue(maxsize=4)
+    cam = CameraThread(cap, stop) if cap else None
+    voice = VoiceThread(listen_once, audio_q, stop)
+
+    def speak(text):
+        # mic stays paused until playback ends, so we don't hear ourselves
+        voice.pause()
+        return say(text, on_done=voice.resume)
 
     print("[INFO] Jarvis mirror ready. Say 'quit' to exit.")
-    if cap: say("Hello. Camera is active.")
+    if cap: speak("Hello. Camera is active.")  # voice thread starts paused until it ends
+    if cam: cam.start()
+    voice.start()
 
-    while True:
-        frame = None
-        if cap:
-            ok, frame = cap.read()
-            if not ok:
-                frame = None
+    mood = "neutral"
+    last_tip_mood, last_tip_at = None, 0.0
+    label = LabelOverlay()  # preview mood text, rendered only when it changes
+
+    while not stop.is_set():
+        frame = cam.get_latest() if cam else None
 
         if frame is not None:
-            mood, faces = mood_from_face_bgr(frame)
-            # draw
-            for (x, y, w, h) in faces:
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-            cv2.putText(frame, f"mood: {mood}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255,255,255), 2)
-            cv2.imshow("Jarvis Mirror (press Q to quit)", frame)
-            if cv2.waitKey(1) & 0xFF in (ord('q'), ord('Q')):
-                print("[INFO] Quitting…")
-                break
-        else:
-            mood = "neutral"
+            # upload once, shared by the Haar pass and the preview
+            uframe = as_umat(frame) if _YUNET is None or SHOW_PREVIEW else None
+            mood, faces = mood_from_face_bgr(frame, uframe)
+            if SHOW_PREVIEW:
+                # draw
+                view = uframe
+                if faces:
+                    for (x, y, w, h) in faces:
+                        cv2.rectangle(view, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                    label.draw(view, f"mood: {mood}")
+                cv2.imshow("Jarvis Mirror (press Q to quit)", view)
+                if cv2.waitKey(1) & 0xFF in (ord('q'), ord('Q')):
+                    print("[INFO] Quitting…")
+                    stop.set()
+                    continue
+
+        # answer whatever the voice thread heard
+        try:
+            user = audio_q.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        if user in ("quit", "exit", "goodbye", "good bye"):
+            done = speak("Goodbye.")
+            if done: done.wait()
+            stop.set()  # stops the camera/voice threads and this loop
+            continue
+        reply = chat_reply(user, mood)
+        print(f"[AI] {reply}")
+        speak(reply)
 
-        # mood tip (spoken only when camera is on and something was seen recently)
-        if cap:
+        # mood tip, only between turns: the mic is already paused for the reply
+        # and nothing else is waiting, so it never talks over the user
+        now = time.monotonic()
+        if (cam and audio_q.empty() and mood != last_tip_mood
+                and now - last_tip_at >= TIP_COOLDOWN):
             print(f"[MOOD] {mood}")
-            say(tip_for_mood(mood))
-
-        # listen & answer
-        user = listen_once()
-        if user:
-            if user in ("quit", "exit", "goodbye", "good bye"):
-                say("Goodbye.")
-                break
-            reply = chat_reply(user, mood)
-            print(f"[AI] {reply}")
-            say(reply)
+            speak(tip_for_mood(mood))
+            last_tip_mood, last_tip_at = mood, now
 
+    stop.set()
+    if cam: cam.join(timeout=1.0)
     if cap:
         cap.release()
+    if SHOW_PREVIEW:
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -2,25 +2,36 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
 import os, json, cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 DATA = "data/users"
 MODELS = "models"
 os.makedirs(MODELS, exist_ok=True)
 
+def _read_gray(path):
+    return cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+
 def load_data():
-    X, y, labels = [], [], {}
+    # collect (path, label) first, then decode in parallel (imread releases the GIL)
+    paths, labels = [], {}
     next_id = 0
     for person in sorted(os.listdir(DATA)):
         pdir = os.path.join(DATA, person)
         if not os.path.isdir(pdir): continue
         if person not in labels:
             labels[person] = next_id; next_id += 1
-        for fn in os.listdir(pdir):
+        for fn in sorted(os.listdir(pdir)):
             if not fn.lower().endswith((".jpg",".jpeg",".png")): continue
-            img = cv2.imread(os.path.join(pdir, fn), cv2.IMREAD_GRAYSCALE)
-            if img is None: continue
-            X.append(img)
-            y.append(labels[person])
+            paths.append((os.path.join(pdir, fn), labels[person]))
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as ex:
+        imgs = list(ex.map(_read_gray, [p for p, _ in paths]))
+
+    X, y = [], []
+    for img, (_, label) in zip(imgs, paths):
+        if img is None: continue
+        X.append(img)
+        y.append(label)
     return X, np.array(y, dtype=np.int32), labels
 
 def main():
@@ -1,13 +1,17 @@
 # scripts/voice_check.py
-import time
-from utils.sound import speak
+import sys, os, time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # add project root to PYTHONPATH
+from utils.sound import say, warmup
 from utils.voice import VoiceRecognizer
 
 CULTURE = "en-US"   # you also have en-GB if you prefer
 
 def main():
+    # on the main thread: SAPI init + API connection before the first line
+    warmup()
+
     print("[TEST] TTS → saying a line now…")
-    speak("Voice test successful. Hello Edgars!", culture=CULTURE)
+    say("Voice test successful. Hello Edgars!")
 
     print("[TEST] STT → I'll listen for ~10 seconds. Say something like 'mirror status' or 'quit'.")
     rec = VoiceRecognizer(culture=CULTURE)
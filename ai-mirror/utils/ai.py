@@ -1,42 +1,359 @@
-from openai import OpenAI
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .openai_client import get_client
+
+try:
+    from .cache import DEFAULT_CACHE_FILE, LLMCache, openai_embedder  # needs numpy
+except Exception:
+    LLMCache = None
+
+TEMPERATURE = 0.5  # part of the cache key; replies are only reused for identical settings
+
+# reply_stream runs the semantic cache lookup (an embeddings request) here,
+# at the same time as the chat stream instead of before it
+_LOOKUPS = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-lookup")
+
+# End of a sentence in streamed output: .!? (plus closing quote/bracket), then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+# Fixed system prompt. It must stay byte-identical between calls (no times,
+# names or random bits) and is deliberately longer than 1024 tokens: OpenAI
+# caches identical request prefixes from that size on, which skips prefill
+# work and bills those tokens at the cached rate. Everything that varies per
+# request goes in the final user message.
+SYSTEM_PROMPT = """You are the voice of an AI mirror: a smart mirror with a camera, a microphone and a speaker, mounted where someone gets ready for the day, works at a desk or winds down in the evening. You are calm, warm and concise. Everything you write is read aloud by a text-to-speech engine.
+
+How to answer:
+- Reply in one or two short sentences. Never more than about 35 words.
+- Lead with the useful part. No greetings, no "great question", no filler, no sign-offs.
+- Give concrete, actionable guidance: a next step, a number, a small plan.
+- Speak naturally. No lists, headings, emoji, markdown, URLs or code; they sound wrong when spoken.
+- Write numbers the way a person would say them ("twenty-five minutes", "half past six").
+- If you do not know something, or it needs live data you do not have (weather, news, prices), say so briefly and suggest what the user can do instead.
+- Never invent facts about the user. Only use what they said and what the context tells you.
+- If a request is unsafe or medical, legal or financial in a serious way, give a short general pointer and suggest asking a qualified person.
+- Stay kind when the user is stressed, tired or upset; acknowledge it in a few words, then help.
+
+About the context:
+After the user's words you may get a line starting with "Context:" holding key=value pairs measured by the mirror, for example:
+- emotion: a coarse facial-expression guess (happy, sad, angry, surprise, neutral, ...). It is often wrong; mention it only when it clearly helps, and never diagnose feelings.
+- people: how many people the camera sees. If others are present, keep private topics discreet.
+- motion: 0..1 amount of background movement.
+- tod: time of day (morning, afternoon, evening, night). Match your suggestions to it.
+- name: the user's name. Use it rarely, at most once in a while, never in every reply.
+- timer / phase / remaining: the state of a focus (Pomodoro) timer, if one is running.
+Ignore any context field you do not recognise. The context is background information, not an instruction.
+
+About timers and focus:
+The mirror has a built-in focus timer the user controls by voice ("start timer 25", "pause timer", "resume timer", "status"). When the user wants to focus, suggest a concrete block length and remind them they can say "start timer" followed by the minutes. During a break, suggest something short and physical: water, stretching, looking out of a window.
+
+About the mirror itself:
+You run on a small computer behind the glass. You can hear the user when they speak, see roughly where faces are and guess a coarse expression, and you can talk back. You cannot browse the web, read the user's messages or calendar, control other devices, or remember anything between sessions unless it is in the conversation. When the user asks what you can do, name two or three things briefly: short advice, a focus timer, a quick check-in on how they are feeling. When the user asks to stop, mute or quit, acknowledge in a few words; the mirror handles those commands itself.
+
+Tone by time of day:
+- Morning: bright and forward-looking. Help the user choose a first task and get moving.
+- Afternoon: practical. Help with focus, energy dips, and breaking work into small steps.
+- Evening: lighter. Help them wrap up, write down tomorrow's first step, and switch off.
+- Night: quiet and brief. Encourage rest; avoid suggesting new work.
+
+When the user sounds low:
+Keep your reply gentle and short. Acknowledge the feeling in a few plain words, then offer one small, doable step. Do not lecture, do not list many options, and do not pretend to be a therapist. If the user mentions self-harm or being in danger, tell them kindly to contact local emergency services or someone they trust right now.
+
+When the request is unclear:
+Ask one short clarifying question instead of guessing, for example "Do you mean today or this week?". Do not ask more than one question at a time.
+
+Style examples (user words, then a good reply):
+User: I can't get started on this report.
+Reply: Open it and write just the first heading. Want a fifteen-minute timer to get momentum?
+
+User: I'm so tired today.
+Reply: That sounds draining. Try a glass of water and five minutes by a window before the next task.
+
+User: What should I do first this morning?
+Reply: Pick the one task that would make today a win and do twenty-five focused minutes on it before email.
+
+User: What's the weather like?
+Reply: I can't check live weather, but a quick look at your phone's forecast before you leave will settle it.
+
+User: Tell me a joke.
+Reply: I told my mirror a secret once. It just reflected on it.
+
+User: How long have I been working?
+Reply: I don't track that unless a timer is running; say "status" and I'll tell you where the current one is.
+
+User: I feel anxious about my presentation.
+Reply: That's normal before presenting. Run through your opening line out loud three times; it steadies the rest.
+
+User: Remind me to drink water.
+Reply: I can't set reminders yet, but a twenty-minute timer works as one. Say "start timer 20" and drink when it ends.
+
+User: Do I look okay?
+Reply: I only see rough shapes, not style, but you look ready. A quick posture check and you're set.
+
+User: I want to go to bed earlier.
+Reply: Pick a fixed lights-out time and start winding down thirty minutes before it, screens off.
+
+Remember: short, spoken, specific, kind."""
 
 class AIResponder:
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini", cache: bool = True):
         self.model = model
         key = os.getenv("OPENAI_API_KEY")
         if not key:
             print("[AI] No API key found in environment — using offline fallback.")
         else:
             print(f"[AI] Connected with key prefix: {key[:10]}...")
-        self.client = OpenAI(api_key=key)
+        # openai (httpx, pydantic, ...) is only imported once there is a key to use
+        self.client = get_client(key) if key else None  # shared with TTS/embeddings
         print(f"[AI] Model: {self.model}")
+        # Route every call through the same prompt-cache bucket. Sent via
+        # extra_body so older openai clients without the kwarg still work.
+        self._prompt_cache_opts = {"prompt_cache_key": f"ai-mirror:{self.model}"}
+        retention = os.getenv("AI_MIRROR_PROMPT_CACHE_RETENTION")  # e.g. "24h", model-dependent
+        if retention:
+            self._prompt_cache_opts["prompt_cache_retention"] = retention
+        self._prompt_tokens = 0
+        self._cached_tokens = 0
+        self.cache = None
+        if cache and LLMCache is not None:
+            # AI_MIRROR_REPLY_CACHE=1 also keeps exact hits across restarts
+            path = DEFAULT_CACHE_FILE if os.getenv("AI_MIRROR_REPLY_CACHE") == "1" else None
+            embed = openai_embedder(self.client) if key else None
+            self.cache = LLMCache(embed, threshold=0.87, maxsize=512, path=path)
 
-    def reply(self, user_text: str, context: dict | None = None) -> str | None:
-        sys_prompt = (
-            "You are a calm, concise AI mirror assistant. "
-            "Respond in 1–2 short sentences with helpful, actionable guidance. "
-            "Avoid filler. Use the context if relevant."
-        )
-        ctx_line = ""
+    @staticmethod
+    def _context_line(context: dict | None) -> str:
         if context:
             try:
                 parts = [f"{k}={v}" for k, v in context.items() if v is not None]
                 if parts:
-                    ctx_line = "Context: " + ", ".join(parts) + "\n"
+                    return "Context: " + ", ".join(parts)
             except Exception:
                 pass
+        return ""
+
+    def _cache_key(self, user_text: str, ctx_line: str) -> str:
+        return LLMCache.key(model=self.model, sys=SYSTEM_PROMPT, ctx=ctx_line,
+                            user=user_text, t=TEMPERATURE)
+
+    @staticmethod
+    def _messages(user_text: str, ctx_line: str) -> list[dict]:
+        # variable content goes last so the prefix above stays cacheable
+        user_msg = f"User: {user_text}" + (f"\n{ctx_line}" if ctx_line else "")
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_msg},
+        ]
+
+    def _prepare(self, user_text: str, context: dict | None, vec=None, embed: bool = True):
+        """
+        Return (messages, cache_key, ctx_line, cached_reply, qvec) for one request.
+        vec/embed are passed to LLMCache.get (see reply_batched).
+        """
+        ctx_line = self._context_line(context)
+        messages = self._messages(user_text, ctx_line)
+        cache_key = cached = qvec = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_text, ctx_line)
+            cached, qvec = self.cache.get(cache_key, user_text, context=ctx_line, vec=vec, embed=embed)
+        return messages, cache_key, ctx_line, cached, qvec
+
+    def reply(self, user_text: str, context: dict | None = None) -> str | None:
+        messages, cache_key, ctx_line, cached, qvec = self._prepare(user_text, context)
+        if cached is not None:
+            return cached
+        if self.client is None:
+            return None
+        return self._complete(messages, user_text, cache_key, ctx_line, qvec)
+
+    def _complete(self, messages, user_text, cache_key, ctx_line, qvec) -> str | None:
+        """One non-streamed chat call; caches and returns the reply (None on error)."""
         try:
             resp = self.client.chat.completions.create(
                 model=self.model,
-                temperature=0.5,
+                temperature=TEMPERATURE,
                 max_tokens=80,
+                messages=messages,
+                extra_body=self._prompt_cache_opts,
+            )
+            self._log_prompt_cache(resp)
+            reply = resp.choices[0].message.content.strip()
+            if self.cache is not None:
+                self.cache.put(cache_key, user_text, reply, context=ctx_line, vec=qvec)
+            return reply
+        except Exception as e:
+            print("[AI] Error:", repr(e))
+            return None
+
+    def reply_stream(self, user_text: str, context: dict | None = None):
+        """
+        Like reply(), but yields the answer sentence by sentence while the
+        model is still generating, so TTS can start on the first one
+        (see sound.say_stream). Yields nothing on error.
+        The semantic cache lookup runs while the stream opens; on a hit the
+        stream is dropped before any of it is yielded.
+        """
+        ctx_line = self._context_line(context)
+        messages = self._messages(user_text, ctx_line)
+        cache_key = lookup = qvec = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_text, ctx_line)
+            cached = self.cache.get_exact(cache_key)
+            if cached is not None:
+                yield cached
+                return
+            if self.client is not None and self.cache.semantic:
+                lookup = _LOOKUPS.submit(self.cache.get_semantic, cache_key, user_text, ctx_line)
+            else:
+                cached, qvec = self.cache.get_semantic(cache_key, user_text, context=ctx_line)
+                if cached is not None:
+                    yield cached
+                    return
+        if self.client is None:
+            return
+
+        def semantic_hit():
+            # wait for the lookup (once); keeps its vector for put()
+            nonlocal lookup, qvec
+            if lookup is None:
+                return None
+            try:
+                cached, qvec = lookup.result()
+            except Exception:
+                cached = None
+            lookup = None
+            return cached
+
+        parts, buf = [], ""
+        stream = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                temperature=TEMPERATURE,
+                max_tokens=80,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                extra_body=self._prompt_cache_opts,
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:  # last chunk, no choices
+                    self._log_prompt_cache(chunk)
+                if not chunk.choices:
+                    continue
+                buf += chunk.choices[0].delta.content or ""
+                while True:
+                    m = _SENTENCE_END.search(buf)
+                    if not m:
+                        break
+                    sentence, buf = buf[:m.end()].strip(), buf[m.end():]
+                    if sentence:
+                        cached = semantic_hit()
+                        if cached is not None:
+                            yield cached
+                            return
+                        parts.append(sentence)
+                        yield sentence
+        except Exception as e:
+            print("[AI] Error:", repr(e))
+            cached = semantic_hit()
+            if cached is not None:
+                yield cached
+            return
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                try:
+                    close()  # releases the connection when the stream is dropped early
+                except Exception:
+                    pass
+        cached = semantic_hit()
+        if cached is not None:
+            yield cached
+            return
+        if buf.strip():
+            parts.append(buf.strip())
+            yield buf.strip()
+        if parts and self.cache is not None:
+            self.cache.put(cache_key, user_text, " ".join(parts), context=ctx_line, vec=qvec)
+
+    def reply_batched(self, texts: list[str], context: dict | None = None) -> list[str | None]:
+        """
+        Answer several utterances with a single request; returns one reply
+        (or None) per text, in order. Cached texts are answered locally and
+        only the rest are sent, as a numbered list with a JSON reply format.
+        Texts that miss the exact cache are embedded with one request.
+        """
+        replies: list[str | None] = [None] * len(texts)
+        ctx_line = self._context_line(context)
+        vecs = [None] * len(texts)
+        if self.cache is not None:
+            need = [i for i, t in enumerate(texts) if not self.cache.has_exact(self._cache_key(t, ctx_line))]
+            for i, vec in zip(need, self.cache.embed_many([texts[i] for i in need])):
+                vecs[i] = vec
+        pending = []  # (index, messages, cache_key, qvec)
+        for i, text in enumerate(texts):
+            messages, cache_key, _, cached, qvec = self._prepare(text, context, vec=vecs[i], embed=False)
+            if cached is not None:
+                replies[i] = cached
+            else:
+                pending.append((i, messages, cache_key, qvec))
+        if not pending or self.client is None:
+            return replies
+        if len(pending) == 1:
+            i, messages, cache_key, qvec = pending[0]
+            replies[i] = self._complete(messages, texts[i], cache_key, ctx_line, qvec)
+            return replies
+
+        listing = "\n".join(f"{n}. {texts[i]}" for n, (i, *_) in enumerate(pending))
+        user_msg = (
+            "The user said several things in a row. Answer each one separately, "
+            "following the same rules. Reply with JSON only: "
+            '{"answers": [{"i": <number>, "answer": "<reply>"}, ...]}\n'
+            + listing + (f"\n{ctx_line}" if ctx_line else "")
+        )
+        try:
+            resp = self.client.chat.completions.create(
+                model=self.model,
+                temperature=TEMPERATURE,
+                max_tokens=80 * len(pending),
+                response_format={"type": "json_object"},
                 messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": ctx_line + f"User: {user_text}"},
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_msg},
                 ],
+                extra_body=self._prompt_cache_opts,
             )
-            return resp.choices[0].message.content.strip()
+            self._log_prompt_cache(resp)
+            answers = json.loads(resp.choices[0].message.content or "{}").get("answers") or []
         except Exception as e:
             print("[AI] Error:", repr(e))
-            return None
+            return replies
+        for item in answers:
+            try:
+                n, answer = int(item["i"]), str(item["answer"]).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not (0 <= n < len(pending)) or not answer:
+                continue
+            i, _, cache_key, qvec = pending[n]
+            replies[i] = answer
+            if self.cache is not None:
+                self.cache.put(cache_key, texts[i], answer, context=ctx_line, vec=qvec)
+        return replies
+
+    def _log_prompt_cache(self, resp) -> None:
+        """Print how much of the prompt OpenAI served from its prefix cache."""
+        try:
+            usage = resp.usage
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+            self._prompt_tokens += usage.prompt_tokens
+            self._cached_tokens += cached
+            ratio = self._cached_tokens / self._prompt_tokens if self._prompt_tokens else 0.0
+            print(f"[AI] Prompt cache: {cached}/{usage.prompt_tokens} tokens (overall {ratio:.0%})")
+        except Exception:
+            pass
@@ -0,0 +1,204 @@
+# utils/cache.py
+# Local reply cache so near-duplicate questions ("what time is it" /
+# "tell me the time") don't cost another LLM round-trip.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Sequence
+
+import numpy as np
+
+
+def openai_embedder(client, model: str = "text-embedding-3-small") -> Callable[[str], Optional[np.ndarray]]:
+    """
+    Return a text -> vector function backed by the OpenAI embeddings API (None on error).
+    Given a list of texts it returns a list of vectors from a single request.
+    """
+    def embed(text):
+        try:
+            resp = client.embeddings.create(model=model, input=text)
+            vecs = [np.asarray(d.embedding, dtype=np.float32) for d in sorted(resp.data, key=lambda d: d.index)]
+            return vecs if isinstance(text, list) else vecs[0]
+        except Exception as e:
+            print("[CACHE] Embedding error:", repr(e))
+            return [None] * len(text) if isinstance(text, list) else None
+    return embed
+
+
+class SemanticCache:
+    """
+    LRU of (embedding, user_text, context, reply).
+    A lookup hits when cosine similarity >= threshold AND the stored context
+    equals the current one (e.g. previous user turn + mood), which avoids
+    serving an answer that only made sense in a different conversation.
+    """
+
+    def __init__(self, embed: Callable[[str], Optional[Sequence[float]]],
+                 threshold: float = 0.92, maxsize: int = 64):
+        self.embed = embed
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, tuple[np.ndarray, str, Hashable, str]]" = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _unit(vec) -> Optional[np.ndarray]:
+        if vec is None:
+            return None
+        v = np.asarray(vec, dtype=np.float32).ravel()
+        n = float(np.linalg.norm(v))
+        return v / n if n > 0 else None
+
+    def lookup(self, text: str, context: Hashable = None, vec=None) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Return (reply or None, query vector). Pass the vector back to `put`
+        on a miss so the text isn't embedded twice. `vec` skips embedding
+        when the caller already has one.
+        """
+        q = self._unit(vec if vec is not None else self.embed(text))
+        if q is None or not self._entries:
+            return None, q
+
+        ids = list(self._entries)
+        vecs = np.stack([self._entries[i][0] for i in ids])
+        sims = vecs @ q  # all stored vectors are unit length
+        for j in np.argsort(sims)[::-1]:
+            if sims[j] < self.threshold:
+                break
+            key = ids[j]
+            _, cached_text, cached_ctx, reply = self._entries[key]
+            if cached_ctx == context:
+                self._entries.move_to_end(key)
+                print(f"[CACHE] hit ({sims[j]:.2f}): {cached_text!r}")
+                return reply, q
+        return None, q
+
+    def put(self, text: str, reply: str, context: Hashable = None, vec=None) -> None:
+        v = self._unit(vec) if vec is not None else self._unit(self.embed(text))
+        if v is None or not reply:
+            return
+        self._entries[self._next_id] = (v, text, context, reply)
+        self._next_id += 1
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "ai-mirror", "replies.json")
+
+
+class LLMCache:
+    """
+    Two-tier reply cache:
+      1. exact – SHA-256 of the full request (model, prompt, context, text,
+         temperature) -> reply, LRU in memory, optionally persisted to JSON
+      2. semantic – SemanticCache over the user text, same context only
+    """
+
+    def __init__(self, embed=None, threshold: float = 0.87, maxsize: int = 512,
+                 path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self._exact: "OrderedDict[str, str]" = OrderedDict()
+        self._semantic = SemanticCache(embed, threshold=threshold, maxsize=maxsize) if embed else None
+        self.hits = {"exact": 0, "semantic": 0, "miss": 0}
+        self._load()
+
+    @staticmethod
+    def key(**parts) -> str:
+        blob = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, text: str, context: Hashable = None, vec=None,
+            embed: bool = True) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Return (reply or None, query vector for put()).
+        A precomputed `vec` is used as is; with embed=False and no vec the
+        semantic tier is skipped instead of embedding `text`.
+        """
+        reply = self.get_exact(key)
+        if reply is not None:
+            return reply, None
+        return self.get_semantic(key, text, context, vec=vec, embed=embed)
+
+    def get_exact(self, key: str) -> Optional[str]:
+        """Exact tier only (no embedding); a miss is not counted."""
+        reply = self._exact.get(key)
+        if reply is not None:
+            self._exact.move_to_end(key)
+            self.hits["exact"] += 1
+        return reply
+
+    def get_semantic(self, key: str, text: str, context: Hashable = None, vec=None,
+                     embed: bool = True) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """The rest of get() once get_exact(key) has missed; counts the hit or miss."""
+        if self._semantic is not None and (vec is not None or embed):
+            reply, vec = self._semantic.lookup(text, context, vec=vec)
+            if reply is not None:
+                self.hits["semantic"] += 1
+                self._remember(key, reply)
+                return reply, vec
+        self.hits["miss"] += 1
+        return None, vec
+
+    @property
+    def semantic(self) -> bool:
+        """True when there is a semantic tier (lookups cost an embeddings call)."""
+        return self._semantic is not None
+
+    def has_exact(self, key: str) -> bool:
+        return key in self._exact
+
+    def embed_many(self, texts: Sequence[str]) -> list:
+        """Vectors for several texts with one call to the embedder (which must accept a list)."""
+        texts = list(texts)
+        if self._semantic is None or not texts:
+            return [None] * len(texts)
+        vecs = self._semantic.embed(texts)
+        return list(vecs) if vecs is not None and len(vecs) == len(texts) else [None] * len(texts)
+
+    def put(self, key: str, text: str, reply: str, context: Hashable = None, vec=None) -> None:
+        if not reply:
+            return
+        self._remember(key, reply)
+        if self._semantic is not None:
+            self._semantic.put(text, reply, context, vec=vec)
+        self._save()
+
+    def _remember(self, key: str, reply: str) -> None:
+        self._exact[key] = reply
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.maxsize:
+            self._exact.popitem(last=False)
+
+    # ---- optional JSON file backend (exact tier only) ----
+    def _load(self) -> None:
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                for k, v in list(data.items())[-self.maxsize:]:
+                    if isinstance(v, str):
+                        self._exact[k] = v
+        except Exception as e:
+            print("[CACHE] Could not load", self.path, "-", repr(e))
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._exact, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("[CACHE] Could not save", self.path, "-", repr(e))
@@ -0,0 +1,75 @@
+# utils/camera.py
+# Camera discovery shared by the probe/debug/enroll scripts.
+# Each VideoCapture open can take 200–800 ms on Windows, so indices are
+# probed in parallel (the backends release the GIL while opening). Backends
+# for the *same* index are tried one after another: opening one device
+# through two backends at once tends to fail with "device busy".
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+BACKENDS = [
+    ("CAP_DSHOW", cv2.CAP_DSHOW),
+    ("CAP_MSMF",  cv2.CAP_MSMF),
+    ("CAP_ANY",   cv2.CAP_ANY),
+]
+
+
+def try_open(idx, backend):
+    """Open, read one frame, release. Returns (opened, (w, h)); (0, 0) if the read failed."""
+    cap = cv2.VideoCapture(idx, backend)
+    try:
+        if not cap.isOpened():
+            return False, (0, 0)
+        ok, frame = cap.read()
+        h, w = (frame.shape[:2] if ok and frame is not None else (0, 0))
+        return True, (w, h)
+    finally:
+        cap.release()
+
+
+def probe(indices=range(6), backends=BACKENDS, max_workers=6):
+    """
+    Try every (backend, index) pair; returns {(backend_name, idx): (opened, (w, h))}.
+    Total time is roughly the slowest single index, not the sum of all opens.
+    """
+    def one_index(idx):
+        return {(name, idx): try_open(idx, flag) for name, flag in backends}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for res in ex.map(one_index, indices):
+            results.update(res)
+    return results
+
+
+def _first_backend(idx, backends):
+    for name, flag in backends:
+        cap = cv2.VideoCapture(idx, flag)
+        if cap.isOpened():
+            return cap, name
+        cap.release()
+    return None, None
+
+
+def open_cam(indices=(0,), backends=BACKENDS):
+    """
+    Open the first working camera, preferring earlier indices and backends.
+    Returns (cap, idx, backend_name) or (None, None, None).
+    """
+    indices = list(indices)
+    with ThreadPoolExecutor(max_workers=max(1, len(indices))) as ex:
+        opened = list(ex.map(lambda i: _first_backend(i, backends), indices))
+
+    chosen = (None, None, None)
+    for idx, (cap, name) in zip(indices, opened):
+        if cap is None:
+            continue
+        if chosen[0] is None:
+            chosen = (cap, idx, name)
+        else:
+            cap.release()  # only keep the preferred one
+    return chosen
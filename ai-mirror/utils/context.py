@@ -3,21 +3,32 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
+
+_ROOT = Path(__file__).resolve().parents[1]  # repo root (../.. from utils/)
+_CONFIG = _ROOT / "config.json"
+
+# path -> (st_mtime_ns, parsed dict); re-parsed only when the file changes
+_CACHE: Dict[Path, Tuple[int, Dict]] = {}
 
 def get_context() -> Dict:
     """
     Load optional runtime context (e.g., settings) from config.json at repo root.
     Returns {} if the file does not exist or is invalid.
+    The parsed file is cached until its mtime changes, so calling this every
+    frame costs a stat() instead of a read + JSON parse. Returns a copy.
     """
     try:
-        root = Path(__file__).resolve().parents[1]  # repo root (../.. from utils/)
-        cfg = root / "config.json"
-        if cfg.is_file():
-            with cfg.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
+        st = _CONFIG.stat()
+        prev = _CACHE.get(_CONFIG)
+        if prev is not None and prev[0] == st.st_mtime_ns:
+            return dict(prev[1])
+        with _CONFIG.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            _CACHE[_CONFIG] = (st.st_mtime_ns, data)
+            return dict(data)
     except Exception:
         pass
+    _CACHE.pop(_CONFIG, None)
     return {}
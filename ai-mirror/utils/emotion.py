@@ -1,26 +1,182 @@
 # utils/emotion.py
-def estimate_emotion_from_face(face_bgr):
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_FACE = 64   # FER's emotion model input size
+_GAP = 24    # black gutter between tiles (FER pads each face box by ~10 px)
+
+MIN_INTERVAL = 0.5  # run the model at most 2x per second; memoized labels in between
+_HASH_SIDE = 16     # faces are keyed by a 16x16 above/below-mean bit pattern
+_CACHE_SIZE = 32
+_NEAR_BITS = 48     # inside MIN_INTERVAL, reuse the label of a cached face within this many differing bits
+
+# Optional INT8 ONNX export of FER's classifier (scripts/export_fer_onnx.py).
+# When present it is run with onnxruntime instead of FER/TensorFlow.
+FER_ONNX = os.getenv(
+    "AI_MIRROR_FER_ONNX",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "fer_int8.onnx"),
+)
+# output order of FER's emotion_model.hdf5
+_EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+# FER loads its Keras model and builds the graph on construction: do it once.
+_DETECTOR = None
+_DETECTOR_LOCK = threading.Lock()
+_SESSION = None
+_SESSION_FAILED = False
+_ORT_BUF = None  # (n, side, side, 1) float32 input batch, grown as needed
+_LABELS = OrderedDict()  # face hash -> label, LRU
+_LAST_RUN = float("-inf")
+
+def _get_detector():
+    global _DETECTOR
+    if _DETECTOR is None:
+        with _DETECTOR_LOCK:
+            if _DETECTOR is None:
+                from fer import FER  # pip install fer==22.4.0
+                _DETECTOR = FER(mtcnn=False)
+    return _DETECTOR
+
+def _get_session():
+    """onnxruntime session for FER_ONNX, or None (missing file or package)."""
+    global _SESSION, _SESSION_FAILED
+    if _SESSION is None and not _SESSION_FAILED:
+        with _DETECTOR_LOCK:
+            if _SESSION is None and not _SESSION_FAILED:
+                try:
+                    if not os.path.isfile(FER_ONNX):
+                        raise FileNotFoundError(FER_ONNX)
+                    import onnxruntime as ort  # pip install onnxruntime
+                    _SESSION = ort.InferenceSession(FER_ONNX, providers=["CPUExecutionProvider"])
+                except Exception:
+                    _SESSION_FAILED = True  # silently use FER
+    return _SESSION
+
+def _onnx_labels(cv2, np, session, faces_bgr):
+    """Classify crops as one batch: gray, model input size, scaled to [-1, 1] like FER."""
+    global _ORT_BUF
+    inp = session.get_inputs()[0]
+    side = inp.shape[1] if isinstance(inp.shape[1], int) else _FACE
+    n = len(faces_bgr)
+    if _ORT_BUF is None or _ORT_BUF.shape[0] < n or _ORT_BUF.shape[1] != side:
+        _ORT_BUF = np.empty((n, side, side, 1), np.float32)
+    batch = _ORT_BUF[:n]
+    for k, face in enumerate(faces_bgr):
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        batch[k, :, :, 0] = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA)
+    batch *= 2.0 / 255.0
+    batch -= 1.0
+    scores = session.run(None, {inp.name: batch})[0]
+    return [_EMOTIONS[j] for j in np.argmax(scores, axis=1)]
+
+def _fer_labels(cv2, np, faces_bgr):
+    """Classify crops with FER; tiles them into one strip so it runs a single batch."""
+    detector = _get_detector()
+    step = _FACE + _GAP
+    strip = np.zeros((_FACE + 2 * _GAP, _GAP + step * len(faces_bgr), 3), np.uint8)
+    boxes = []
+    for n, face in enumerate(faces_bgr):
+        x = _GAP + n * step
+        strip[_GAP:_GAP + _FACE, x:x + _FACE] = cv2.resize(
+            face, (_FACE, _FACE), interpolation=cv2.INTER_AREA)
+        boxes.append((x, _GAP, _FACE, _FACE))
+
+    # FER expects RGB
+    strip_rgb = cv2.cvtColor(strip, cv2.COLOR_BGR2RGB)
+    results = detector.detect_emotions(strip_rgb, face_rectangles=boxes)
+
+    # results come back in box order; pick the highest scoring emotion per face
+    labels = [None] * len(faces_bgr)
+    for n, res in enumerate((results or [])[:len(labels)]):
+        scores = res.get("emotions") or {}
+        if scores:
+            labels[n] = max(scores, key=scores.get) or None
+    return labels
+
+def _classify(cv2, np, crops):
+    """One model call for the crops: the ONNX session when available, FER otherwise."""
+    session = _get_session()
+    return _onnx_labels(cv2, np, session, crops) if session is not None else _fer_labels(cv2, np, crops)
+
+def _face_hash(cv2, np, face_bgr):
+    """Average hash: near-identical crops (same face, same expression) share a key."""
+    gray = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (_HASH_SIDE, _HASH_SIDE), interpolation=cv2.INTER_AREA)
+    return np.packbits(small > small.mean()).tobytes()
+
+def _nearest_label(np, face_hash):
+    """Label of the closest memoized face hash, or None if none is close enough."""
+    best, label = _NEAR_BITS + 1, None
+    q = np.frombuffer(face_hash, np.uint8)
+    for h, lab in _LABELS.items():
+        d = int(np.unpackbits(q ^ np.frombuffer(h, np.uint8)).sum())
+        if d < best:
+            best, label = d, lab
+    return label
+
+def estimate_emotion_from_face(face_bgr, remember=True):
     """
     Return a coarse emotion label ('happy', 'sad', 'angry', 'surprise', 'neutral', ...).
     If the optional FER package isn't installed, we fall back to 'neutral'.
     """
+    if face_bgr is None:
+        return "neutral"
+    return estimate_emotion_from_face_batch([face_bgr], remember=remember)[0]
+
+def estimate_emotion_from_face_batch(faces_bgr, remember=True):
+    """
+    Label several face crops with one model call; returns one label per crop.
+    Uses the INT8 ONNX model when available, otherwise FER. For FER, crops
+    are resized to the model input and tiled into a single strip, and FER is
+    given the tile boxes, so it skips its own face search and runs the
+    classifier on all faces as one batch.
+    Crops seen recently (by average hash) reuse their label, and the model
+    runs at most once per MIN_INTERVAL; in between each new crop gets the
+    label of the most similar memoized face (or 'neutral').
+    remember=False (warm-up passes) always runs the model and neither reads
+    nor updates the memoized labels or the rate limit.
+    """
+    global _LAST_RUN
+    faces_bgr = list(faces_bgr)
+    labels = ["neutral"] * len(faces_bgr)
     try:
         import cv2
-        from fer import FER  # pip install fer==22.4.0
+        import numpy as np
 
-        if face_bgr is None:
-            return "neutral"
+        idx = [i for i, f in enumerate(faces_bgr) if f is not None and f.size]
+        if not remember:
+            crops = [faces_bgr[i] for i in idx]
+            for i, label in zip(idx, _classify(cv2, np, crops) if crops else []):
+                labels[i] = label or labels[i]
+            return labels
 
-        # FER expects RGB
-        face_rgb = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2RGB)
-        detector = FER(mtcnn=False)
-        emotions = detector.detect_emotions(face_rgb)
-        if not emotions:
-            return "neutral"
+        hashes = {}
+        for i in idx:
+            hashes[i] = _face_hash(cv2, np, faces_bgr[i])
+            if hashes[i] in _LABELS:
+                _LABELS.move_to_end(hashes[i])
+                labels[i] = _LABELS[hashes[i]]
+        idx = [i for i in idx if hashes[i] not in _LABELS]
+        if not idx:
+            return labels
 
-        # Pick the highest scoring emotion
-        scores = emotions[0]["emotions"]
-        return max(scores, key=scores.get) or "neutral"
+        now = time.monotonic()
+        if now - _LAST_RUN < MIN_INTERVAL:
+            for i in idx:
+                labels[i] = _nearest_label(np, hashes[i]) or labels[i]
+            return labels
+        _LAST_RUN = now
+
+        found = _classify(cv2, np, [faces_bgr[i] for i in idx])
+        for i, label in zip(idx, found):
+            if label:
+                labels[i] = label
+                _LABELS[hashes[i]] = label
+        while len(_LABELS) > _CACHE_SIZE:
+            _LABELS.popitem(last=False)
+        return labels
 
     except Exception:
-        return "neutral"
+        return labels
@@ -0,0 +1,39 @@
+# utils/openai_client.py
+# One OpenAI client for the whole process (chat, TTS, embeddings). Every
+# call then reuses the same pool of keep-alive connections (HTTP/2 when the
+# h2 package is installed) instead of a fresh client and TLS handshake.
+# Built on first use: importing openai/httpx is slow on a Pi and pointless
+# without a key.
+
+import os
+import threading
+
+OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+
+_client = None
+_lock = threading.Lock()
+
+def _http_client():
+    import httpx  # installed with openai
+    limits = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+    try:
+        return httpx.Client(http2=True, timeout=30.0, limits=limits)
+    except ImportError:
+        # http2=True needs `pip install h2`; pooling still works over HTTP/1.1
+        return httpx.Client(timeout=30.0, limits=limits)
+
+def get_client(api_key=None):
+    """The shared OpenAI client (created on the first call; api_key defaults to OPENAI_API_KEY)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(api_key=api_key or OPENAI_KEY, http_client=_http_client())
+    return _client
+
+def __getattr__(name):
+    # `from utils.openai_client import CLIENT` also works, still lazily
+    if name == "CLIENT":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
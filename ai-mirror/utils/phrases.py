@@ -11,80 +11,93 @@
 
 from __future__ import annotations
 import random
-from collections import deque
-from typing import Dict, List, Optional
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Optional, Sequence
 
 # ---------------- Module memory (prevents boring repeats) ----------------
 
 _RECENT = deque(maxlen=24)     # recent fully-rendered phrases
+_RECENT_SET = Counter()        # same lines as _RECENT, for O(1) membership (counted: lines can repeat)
 _LAST_EMO = None               # last emotion we phrased for
+_RNG = random.Random()         # private generator; no shared state with the random module
 
 def _novel(line: str) -> bool:
-    return line not in _RECENT
+    return line not in _RECENT_SET
 
 def _remember(line: str) -> None:
+    if len(_RECENT) == _RECENT.maxlen:
+        old = _RECENT[0]  # about to be pushed out by append()
+        _RECENT_SET[old] -= 1
+        if not _RECENT_SET[old]:
+            del _RECENT_SET[old]
     _RECENT.append(line)
+    _RECENT_SET[line] += 1
 
 # ---------------- Small libraries of mixable fragments -------------------
 
 OPENERS = {
-    "morning": [
+    "morning": (
         "Good morning", "Fresh start", "New day energy"
-    ],
-    "afternoon": [
+    ),
+    "afternoon": (
         "Good afternoon", "Midday momentum", "Keeping pace"
-    ],
-    "evening": [
+    ),
+    "evening": (
         "Good evening", "Winding down with focus", "Evening clarity"
-    ],
-    "night": [
+    ),
+    "night": (
         "Late but steady", "Quiet hours focus", "Night mode"
-    ],
+    ),
 }
 
-HAPPY = [
+HAPPY = (
     "Love that vibe", "That smile suits you", "Nice energy",
     "Mood looks great", "Looking upbeat"
-]
+)
 
-SURPRISED = [
+SURPRISED = (
     "Something unexpected?", "Caught off guard?", "Surprise face, huh?"
-]
+)
 
-ANGRY = [
+ANGRY = (
     "Anger is just energy", "Strong focus incoming", "Let’s channel it"
-]
+)
 
-SAD = [
+SAD = (
     "Let’s keep it gentle", "Small steps still count", "Steady and kind"
-]
+)
 
-NEUTRAL = [
+NEUTRAL = (
     "Ready when you are", "Calm and focused", "I’m with you"
-]
+)
 
-ACTIONS = [
+ACTIONS = (
     "Want a {len}-minute focus block?",
     "Shall I set a {len}-minute timer?",
     "How about a tiny next step?",
     "Want a two-minute micro-plan?",
     "Prefer a quick summary of today?"
-]
+)
 
 TAILS_PEOPLE = {
-    0: ["It’s just us here.", "Room is all yours."],
-    1: ["Looks like there’s someone with you.", "Seems you’re not alone."],
-    "many": ["I see a busy background.", "Looks lively behind you."]
+    0: ("It’s just us here.", "Room is all yours."),
+    1: ("Looks like there’s someone with you.", "Seems you’re not alone."),
+    "many": ("I see a busy background.", "Looks lively behind you.")
 }
 
+_DEFAULT_OPENERS = ("Let's focus",)
+_LENGTHS = (10, 15, 20, 25)      # timer lengths suggested in ACTIONS
+_ALT_LENGTHS = (12, 18, 30)
+
 def _people_tail(people: Optional[int]) -> str:
     if people is None:
         return ""
     if people <= 0:
-        return random.choice(TAILS_PEOPLE[0])
+        return _RNG.choice(TAILS_PEOPLE[0])
     if people == 1:
-        return random.choice(TAILS_PEOPLE[1])
-    return random.choice(TAILS_PEOPLE["many"])
+        return _RNG.choice(TAILS_PEOPLE[1])
+    return _RNG.choice(TAILS_PEOPLE["many"])
 
 def _motion_tail(motion: Optional[float]) -> str:
     if motion is None:
@@ -97,25 +110,57 @@ def _motion_tail(motion: Optional[float]) -> str:
         return "Background looks calm."
     return ""
 
-def _choose_nonrepeat(cands: List[str]) -> str:
+def _choose_nonrepeat(cands: Sequence[str]) -> str:
     # Prefer novel; fallback to anything if all seen
-    novel = [c for c in cands if _novel(c)]
-    return random.choice(novel if novel else cands)
+    novel = tuple(c for c in cands if c not in _RECENT_SET)
+    return _RNG.choice(novel or cands)
 
-def _emotion_bucket(em: Optional[str]) -> List[str]:
+def _emotion_bucket(em: Optional[str]) -> Sequence[str]:
     if em == "happy": return HAPPY
     if em == "surprised": return SURPRISED
     if em == "angry": return ANGRY
     if em == "sad": return SAD
     return NEUTRAL
 
+# ---------------- Short-lived phrase cache ----------------
+# A steady scene produces nearly the same context many times per second;
+# within PHRASE_TTL it gets the same line back instead of a new one.
+
+PHRASE_TTL = 10.0        # seconds a rendered line is reused for the same scene
+_PHRASE_CACHE_SIZE = 128
+_PHRASE_CACHE: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+
+def _scene_key(ctx: Dict) -> tuple:
+    people = ctx.get("people")
+    if people is not None:
+        people = 0 if people <= 0 else 1 if people == 1 else "many"
+    motion = ctx.get("motion")
+    if motion is not None:
+        motion = round(motion / 0.05)  # 0.05-wide buckets
+    return (ctx.get("tod"), ctx.get("emotion"), people, motion, ctx.get("name"))
+
 # ---------------- Public API ----------------
 
 def get_phrase(ctx: Dict) -> str:
     """
     Build a fresh phrase from context and avoid repeating recent outputs.
     ctx keys: emotion, people, motion, tod, name
+    The same (quantized) scene returns the same line for PHRASE_TTL seconds.
     """
+    key = _scene_key(ctx)
+    now = time.monotonic()
+    hit = _PHRASE_CACHE.get(key)
+    if hit is not None and now - hit[0] <= PHRASE_TTL:
+        _PHRASE_CACHE.move_to_end(key)
+        return hit[1]
+    line = _render_phrase(ctx)
+    _PHRASE_CACHE[key] = (now, line)
+    _PHRASE_CACHE.move_to_end(key)
+    while len(_PHRASE_CACHE) > _PHRASE_CACHE_SIZE:
+        _PHRASE_CACHE.popitem(last=False)
+    return line
+
+def _render_phrase(ctx: Dict) -> str:
     name = ctx.get("name") or "there"
     tod = ctx.get("tod") or "day"
     emotion = ctx.get("emotion") or "neutral"
@@ -123,14 +168,14 @@ def get_phrase(ctx: Dict) -> str:
     motion = ctx.get("motion")
 
     # light variety for timer length suggestions
-    length = random.choice([10, 15, 20, 25])
+    length = _RNG.choice(_LENGTHS)
 
-    opener_pool = OPENERS.get(tod, ["Let's focus"])
+    opener_pool = OPENERS.get(tod, _DEFAULT_OPENERS)
     affect_pool = _emotion_bucket(emotion)
 
-    opener = random.choice(opener_pool)
-    affect = random.choice(affect_pool)
-    action = random.choice(ACTIONS).format(len=length)
+    opener = _RNG.choice(opener_pool)
+    affect = _RNG.choice(affect_pool)
+    action = _RNG.choice(ACTIONS).format(len=length)
 
     tails = [ _people_tail(people), _motion_tail(motion) ]
     tails = [t for t in tails if t]  # drop empty
@@ -142,7 +187,7 @@ def get_phrase(ctx: Dict) -> str:
         f"{action}",
     ]
     # Occasionally change order of the middle bits
-    if random.random() < 0.35:
+    if _RNG.random() < 0.35:
         parts[1], parts[2] = parts[2], parts[1]
 
     if tails:
@@ -153,9 +198,9 @@ def get_phrase(ctx: Dict) -> str:
     # Guard against trivial repetition
     if not _novel(line):
         # regenerate once with new draws
-        opener = random.choice(opener_pool)
+        opener = _RNG.choice(opener_pool)
         affect = _choose_nonrepeat(affect_pool)
-        action = random.choice(ACTIONS).format(len=length if random.random() < 0.5 else random.choice([12, 18, 30]))
+        action = _RNG.choice(ACTIONS).format(len=length if _RNG.random() < 0.5 else _RNG.choice(_ALT_LENGTHS))
         parts = [f"{opener}, {name}.", f"{affect}.", f"{action}"]
         if tails: parts.append(" ".join(tails))
         line = " ".join(parts)
@@ -2,8 +2,12 @@
 import os
 import io
 import time
+import queue
+import threading
 import contextlib
 
+from .openai_client import get_client
+
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 
 # ---- Offline TTS (Windows SAPI via pyttsx3) ----
@@ -22,23 +26,79 @@ def say_offline(text: str):
     _engine.runAndWait()
 
 # ---- Online TTS via OpenAI ----
-def say_online(text: str):
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_KEY)
-    # Use tts-1 (or tts-1-hd) with a common voice
-    resp = client.audio.speech.create(
+TTS_RATE = 24000  # OpenAI "pcm" output: 24 kHz, 16-bit mono
+
+def tts_response(text: str):
+    """Streaming OpenAI TTS response for text (a context manager; raw TTS_RATE PCM)."""
+    return get_client(OPENAI_KEY).audio.speech.with_streaming_response.create(
         model="tts-1",
         voice="alloy",
-        input=text
+        input=text,
+        response_format="pcm",
     )
-    # resp is a streaming object; get bytes and play
-    audio_bytes = resp.read()
-    # Simple playback without extra deps: write a temp WAV and play it via winsound
-    import tempfile, winsound
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-        f.write(audio_bytes)
-        path = f.name
-    winsound.PlaySound(path, winsound.SND_FILENAME)
+
+def _open_output(sd):
+    stream = sd.RawOutputStream(samplerate=TTS_RATE, channels=1, dtype="int16")
+    stream.start()
+    return stream
+
+def _close_output(stream):
+    stream.stop()  # drains what is still buffered
+    stream.close()
+
+def _write_pcm(stream, chunks) -> int:
+    """Write PCM chunks to an output stream; returns the number of bytes played."""
+    carry, n = b"", 0
+    for chunk in chunks:
+        chunk = carry + chunk
+        cut = len(chunk) & ~1  # write whole 16-bit samples only
+        stream.write(chunk[:cut])
+        carry = chunk[cut:]
+        n += cut
+    return n
+
+def say_online(text: str):
+    """Stream PCM from OpenAI TTS to the speaker as it arrives (needs sounddevice)."""
+    import sounddevice as sd  # lazy import; ImportError -> offline fallback in say()
+    with tts_response(text) as resp:
+        stream = _open_output(sd)
+        try:
+            _write_pcm(stream, resp.iter_bytes(chunk_size=4096))
+        finally:
+            _close_output(stream)
+
+def _fetch_pcm(text: str, out: queue.Queue):
+    """Download TTS for text into `out` as PCM chunks, then None (also on error)."""
+    try:
+        with tts_response(text) as resp:
+            for chunk in resp.iter_bytes(chunk_size=4096):
+                out.put(chunk)
+    except Exception as e:
+        print(f"[TTS] Error: {e}")
+    finally:
+        out.put(None)
+
+def warmup():
+    """
+    Pay one-time TTS setup before the first utterance: SAPI/COM init for the
+    offline voice, and DNS + TLS to the API on the shared client for the
+    online one. Safe to run in a background thread; never raises.
+    SAPI objects belong to the COM apartment of the thread that made them,
+    so off the main thread only the (slow) driver imports are preloaded.
+    """
+    try:
+        if threading.current_thread() is threading.main_thread():
+            _ensure_pyttsx3()
+        else:
+            import pyttsx3, pyttsx3.drivers.sapi5  # noqa: F401
+    except Exception:
+        pass
+    if OPENAI_KEY:
+        try:
+            # a free metadata call is enough to open the pooled connection
+            get_client(OPENAI_KEY).models.retrieve("tts-1")
+        except Exception:
+            pass
 
 def say(text: str):
     """Speak text, using OpenAI TTS when available, else offline SAPI."""
@@ -55,3 +115,63 @@ def say(text: str):
         except Exception as e2:
             print(f"[TTS] Failed to speak: {e2}")
             # last-resort quiet failure; no beep spam
+
+def say_stream(sentences) -> str:
+    """
+    Speak sentences from an iterator (e.g. AIResponder.reply_stream) while it
+    is still producing them, and return the text spoken.
+    A reader thread queues each sentence as it arrives and, for online TTS,
+    immediately starts downloading its audio. This thread plays them in
+    order through one output stream, so neither generation nor the next
+    sentence's TTS request waits for the current sentence to finish.
+    """
+    sd = None
+    if OPENAI_KEY:
+        try:
+            import sounddevice as sd
+        except Exception:
+            sd = None
+    q = queue.Queue()
+
+    def produce():
+        try:
+            for sentence in sentences:
+                pcm = None
+                if sd is not None:
+                    pcm = queue.Queue()
+                    threading.Thread(target=_fetch_pcm, args=(sentence, pcm), daemon=True).start()
+                q.put((sentence, pcm))
+        except Exception as e:
+            print(f"[TTS] Stream error: {e}")
+        finally:
+            q.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    spoken = []
+    stream = None
+    try:
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            sentence, pcm = item
+            spoken.append(sentence)
+            if pcm is None:
+                say(sentence)
+                continue
+            print(f"[TTS] {sentence}")
+            try:
+                if stream is None:
+                    stream = _open_output(sd)
+                if _write_pcm(stream, iter(pcm.get, None)):
+                    continue
+            except Exception as e:
+                print(f"[TTS] Fallback -> offline (reason: {e})")
+            try:
+                say_offline(sentence)
+            except Exception as e2:
+                print(f"[TTS] Failed to speak: {e2}")
+    finally:
+        if stream is not None:
+            _close_output(stream)
+    return " ".join(spoken)
@@ -0,0 +1,119 @@
+# utils/stt.py
+# Speech-to-text engine selection.
+#   AI_MIRROR_STT=google  (default) – Google Web Speech via SpeechRecognition
+#   AI_MIRROR_STT=local             – offline Vosk, no network round-trip
+#   AI_MIRROR_STT=whisper           – offline faster-whisper (int8 on CPU)
+# Local engines fall back to Google if their package/model is missing.
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+
+import speech_recognition as sr
+
+STT_ENGINE = os.getenv("AI_MIRROR_STT", "google").strip().lower()
+
+# Unpack e.g. https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip here
+VOSK_MODEL_DIR = os.getenv(
+    "AI_MIRROR_VOSK_MODEL",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "vosk-model-small-en-us-0.15"),
+)
+
+# any faster-whisper model name or a local CTranslate2 model directory
+WHISPER_MODEL = os.getenv("AI_MIRROR_WHISPER_MODEL", "base.en")
+
+
+class LocalSTT:
+    """Offline recognizer wrapping vosk.KaldiRecognizer (16 kHz mono int16)."""
+
+    RATE = 16000
+    CHUNK = 6400  # 200 ms of audio per AcceptWaveform call
+
+    _model = None
+    _lock = threading.Lock()
+
+    def __init__(self, model_dir: str = VOSK_MODEL_DIR):
+        from vosk import Model, SetLogLevel  # pip install vosk
+
+        with LocalSTT._lock:
+            if LocalSTT._model is None:
+                SetLogLevel(-1)
+                LocalSTT._model = Model(model_dir)
+        self.model = LocalSTT._model
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        """Return the transcript; raises sr.UnknownValueError if nothing was understood."""
+        from vosk import KaldiRecognizer
+
+        rec = KaldiRecognizer(self.model, self.RATE)
+        raw = audio.get_raw_data(convert_rate=self.RATE, convert_width=2)
+        parts = []
+        for i in range(0, len(raw), self.CHUNK):
+            if rec.AcceptWaveform(raw[i:i + self.CHUNK]):
+                parts.append(json.loads(rec.Result()).get("text", ""))
+        parts.append(json.loads(rec.FinalResult()).get("text", ""))
+        text = " ".join(p for p in parts if p).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class WhisperSTT:
+    """Offline recognizer on faster-whisper; int8 weights run CTranslate2's int8 CPU kernels."""
+
+    _model = None
+    _lock = threading.Lock()
+
+    def __init__(self, model_name: str = WHISPER_MODEL):
+        from faster_whisper import WhisperModel  # pip install faster-whisper
+
+        with WhisperSTT._lock:
+            if WhisperSTT._model is None:
+                WhisperSTT._model = WhisperModel(model_name, device="cpu", compute_type="int8")
+        self.model = WhisperSTT._model
+        self.english_only = model_name.endswith(".en")
+
+    def transcribe(self, audio: sr.AudioData, language: str = "en-US") -> str:
+        """Return the transcript; raises sr.UnknownValueError if nothing was understood."""
+        lang = "en" if self.english_only else language.split("-")[0].lower()
+        segments, _ = self.model.transcribe(io.BytesIO(audio.get_wav_data()), language=lang,
+                                            beam_size=1, vad_filter=True)
+        text = " ".join(seg.text.strip() for seg in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+_ENGINES = {"local": LocalSTT, "whisper": WhisperSTT}
+_engine = None
+_engine_failed = False
+
+
+def _local_engine():
+    global _engine, _engine_failed
+    if _engine is None and not _engine_failed:
+        try:
+            _engine = _ENGINES[STT_ENGINE]()
+        except Exception as e:
+            _engine_failed = True
+            print(f"[VOICE] Local STT ({STT_ENGINE}) unavailable ({e}); using Google.")
+    return _engine
+
+
+def recognize(recognizer: sr.Recognizer, audio: sr.AudioData, language: str = "en-US") -> str:
+    """
+    Transcribe with the configured engine. Raises the same sr exceptions as
+    recognize_google so existing error handling keeps working.
+    """
+    if STT_ENGINE == "whisper":
+        engine = _local_engine()
+        if engine is not None:
+            return engine.transcribe(audio, language=language)
+    elif STT_ENGINE == "local":
+        engine = _local_engine()
+        if engine is not None:
+            return engine.transcribe(audio)
+    return recognizer.recognize_google(audio, language=language)
@@ -1,5 +1,5 @@
 # utils/timer.py
-import threading, time
+import math, threading, time
 
 class PomodoroTimer:
     def __init__(self, on_tick=None, on_phase=None, on_done=None):
@@ -7,6 +7,7 @@ class PomodoroTimer:
         self._t = None
         self._stop = False
         self._paused = False
+        self._wake = threading.Event()  # set by pause/resume/stop to interrupt a wait
         self._on_tick = on_tick   # (remaining_secs, phase) -> None
         self._on_phase = on_phase # (phase) -> None  # "work" | "break"
         self._on_done = on_done   # () -> None
@@ -30,21 +31,37 @@ class PomodoroTimer:
         if self._on_done: self._on_done()
 
     def _countdown(self, seconds, phase):
+        # Sleeps until the next whole-second boundary of a monotonic deadline
+        # (no drift from callback time), and wakes early on pause/resume/stop.
         self._phase = phase
         if self._on_phase: self._on_phase(phase)
-        self._remaining = seconds
-        while self._remaining > 0:
+        self._remaining = round(seconds)
+        end = time.monotonic() + self._remaining
+        paused_at = None
+        while True:
+            self._wake.clear()
             if self._stop: self._phase = "idle"; return False
-            if not self._paused:
+            now = time.monotonic()
+            if self._paused:
+                if paused_at is None: paused_at = now
+                self._wake.wait()
+                continue
+            if paused_at is not None:
+                end += now - paused_at  # the deadline moves by the time spent paused
+                paused_at = None
+            left = end - now
+            whole = max(0, math.ceil(left))
+            while self._remaining > whole:  # one on_tick per whole second, even if late
                 self._remaining -= 1
                 if self._on_tick: self._on_tick(self._remaining, self._phase)
-            time.sleep(1)
-        return True
+            if left <= 0: return True
+            self._wake.wait(timeout=left - (whole - 1))
 
-    def pause(self):  self._paused = True
-    def resume(self): self._paused = False
+    def pause(self):  self._paused = True;  self._wake.set()
+    def resume(self): self._paused = False; self._wake.set()
     def stop(self):
         self._stop = True
+        self._wake.set()
     def is_running(self): return self._t is not None and self._t.is_alive()
     def status(self): return dict(phase=self._phase, remaining=self._remaining, running=self.is_running(), paused=self._paused)
     def remaining(self): return self._remaining
@@ -1,27 +1,228 @@
 # utils/vision.py
+import os
+import threading
+import time
 import cv2
+import numpy as np
 
 # Use built-in frontal face cascade
 _CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
 _CASCADE = cv2.CascadeClassifier(_CASCADE_PATH)
 
-def detect_faces_fast(frame_bgr):
+# Optional INT8 YuNet face detector (OpenCV DNN). Download from
+# https://github.com/opencv/opencv_zoo/tree/main/models/face_detection_yunet
+YUNET_MODEL = os.getenv(
+    "AI_MIRROR_YUNET",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "face_detection_yunet_2023mar_int8.onnx"),
+)
+
+def load_yunet(input_size=(320, 320), score_threshold=0.7):
+    """Return a cv2.FaceDetectorYN for YUNET_MODEL, or None if it can't be used."""
+    if not hasattr(cv2, "FaceDetectorYN") or not os.path.isfile(YUNET_MODEL):
+        return None
+    try:
+        return cv2.FaceDetectorYN.create(YUNET_MODEL, "", input_size, score_threshold=score_threshold)
+    except cv2.error as e:
+        print(f"[VISION] YuNet unavailable: {e}")
+        return None
+
+def yunet_boxes(detector, img_bgr):
+    """Run YuNet on a BGR image; returns [(x, y, w, h), ...] clipped to the image."""
+    h, w = img_bgr.shape[:2]
+    detector.setInputSize((w, h))
+    _, faces = detector.detect(img_bgr)
+    if faces is None:
+        return []
+    boxes = []
+    for f in faces:
+        x, y = max(0, int(f[0])), max(0, int(f[1]))
+        bw, bh = min(int(f[2]), w - x), min(int(f[3]), h - y)
+        if bw > 0 and bh > 0:
+            boxes.append((x, y, bw, bh))
+    return boxes
+
+# detect_faces_fast prefers YuNet when the model file is present (Haar otherwise).
+# It always sees a YUNET_WIDTH-wide copy of the frame; boxes are scaled back.
+YUNET_WIDTH = 320
+_YUNET = load_yunet((YUNET_WIDTH, 240))
+# Scratch buffers reused between frames (reallocated only when the frame size
+# changes). Kept per thread so callers on different threads never share one.
+_BUFS = threading.local()
+
+def _buffer(name, shape):
+    buf = getattr(_BUFS, name, None)
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, np.uint8)
+        setattr(_BUFS, name, buf)
+    return buf
+
+def _detect_yunet(frame_bgr):
+    frame_bgr = to_host(frame_bgr)
+    h, w = frame_bgr.shape[:2]
+    if w <= YUNET_WIDTH:
+        return yunet_boxes(_YUNET, frame_bgr)
+    size = (YUNET_WIDTH, max(1, round(h * YUNET_WIDTH / w)))
+    small = cv2.resize(frame_bgr, size, dst=_buffer("det", (size[1], size[0], 3)),
+                       interpolation=cv2.INTER_LINEAR)
+    inv = w / YUNET_WIDTH
+    return [(int(x * inv), int(y * inv), int(bw * inv), int(bh * inv))
+            for (x, y, bw, bh) in yunet_boxes(_YUNET, small)]
+
+# OpenCV T-API: when OpenCL is available, per-frame pixel ops (cvtColor,
+# resize, drawing, the Haar scan) run on the GPU through cv2.UMat. AI_MIRROR_OPENCL=0 disables it.
+USE_OPENCL = os.getenv("AI_MIRROR_OPENCL", "1") == "1" and cv2.ocl.haveOpenCL()
+cv2.ocl.setUseOpenCL(USE_OPENCL)
+
+def as_umat(img):
+    """Wrap a numpy image for the OpenCL path; returns it unchanged without OpenCL."""
+    if USE_OPENCL and img is not None and not isinstance(img, cv2.UMat):
+        return cv2.UMat(img)
+    return img
+
+def to_host(img):
+    """Download a UMat back into a numpy array (no-op for numpy input)."""
+    return img.get() if isinstance(img, cv2.UMat) else img
+
+def to_gray(frame_bgr):
+    """
+    BGR -> gray without allocating a new image every frame.
+    The returned array is overwritten by the next call on the same thread;
+    copy it to keep it. UMat input stays on the device and returns a UMat.
+    """
+    if isinstance(frame_bgr, cv2.UMat):
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY, dst=_buffer("gray", frame_bgr.shape[:2]))
+
+class LabelOverlay:
+    """
+    Text label for preview windows. The text is rasterized into a small patch
+    only when it changes (at most once per `min_interval` seconds) and is then
+    pasted into the top-left corner, a memcpy instead of per-frame putText.
+    """
+
+    def __init__(self, scale=0.9, color=(255, 255, 255), thickness=2, min_interval=1.0):
+        self.scale = scale
+        self.color = color
+        self.thickness = thickness
+        self.min_interval = min_interval
+        self._patch = None
+        self._text = None
+        self._at = float("-inf")
+
+    def draw(self, frame, text):
+        """Paste the (possibly re-rendered) label onto frame (numpy or UMat) in place."""
+        now = time.monotonic()
+        if text != self._text and now - self._at >= self.min_interval:
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            (tw, th), base = cv2.getTextSize(text, font, self.scale, self.thickness)
+            patch = np.zeros((th + base + 16, tw + 20, 3), np.uint8)
+            cv2.putText(patch, text, (10, th + 8), font, self.scale, self.color,
+                        self.thickness, cv2.LINE_AA)
+            self._patch, self._text, self._at = patch, text, now
+        if self._patch is None:
+            return frame
+
+        h, w = self._patch.shape[:2]
+        if isinstance(frame, cv2.UMat):
+            cv2.copyTo(self._patch, None, cv2.UMat(frame, (0, h), (0, w)))
+        else:
+            h, w = min(h, frame.shape[0]), min(w, frame.shape[1])
+            frame[0:h, 0:w] = self._patch[0:h, 0:w]
+        return frame
+
+# Faces move little between frames: a full detection pass runs on every
+# DETECT_EVERY-th call only. In between, each face is searched for again in a
+# small padded window around where it was last seen.
+DETECT_EVERY = 5
+DETECT_WIDTH = 320  # Haar full passes run on at most this many pixels along the long side
+ROI_PAD = 0.5       # window padding around the last box, as a fraction of its size
+ROI_FACE = 64       # windows are downscaled so the face is about this many pixels wide
+_LAST_BOXES = []
+_FRAME_IDX = 0
+
+def _detect_haar(frame_bgr, scale):
+    # gray -> downscale. With OpenCL the frame is a UMat and every step, the
+    # cascade scan included, runs on the device (T-API); on the numpy path
+    # each step writes into a reused buffer instead.
+    gray = to_gray(as_umat(frame_bgr))
+    if scale < 1.0:
+        if isinstance(gray, cv2.UMat):
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            h, w = gray.shape
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            gray = cv2.resize(gray, size, dst=_buffer("small", (size[1], size[0])),
+                              interpolation=cv2.INTER_AREA)
+    # Slightly larger minSize reduces false positives
+    min_side = max(20, int(round(80 * scale)))
+    faces = _CASCADE.detectMultiScale(
+        gray,
+        scaleFactor=1.1,
+        minNeighbors=5,
+        minSize=(min_side, min_side),
+    )
+    inv = 1.0 / scale
+    return [(int(x * inv), int(y * inv), int(w * inv), int(h * inv)) for (x, y, w, h) in faces]
+
+def _redetect_rois(frame_bgr, boxes):
+    """Search for each face again near its previous box; faces not found are dropped."""
+    frame_bgr = to_host(frame_bgr)
+    H, W = frame_bgr.shape[:2]
+    found = []
+    for (x, y, w, h) in boxes:
+        px, py = int(w * ROI_PAD), int(h * ROI_PAD)
+        x0, y0 = max(0, x - px), max(0, y - py)
+        x1, y1 = min(W, x + w + px), min(H, y + h + py)
+        roi = frame_bgr[y0:y1, x0:x1]
+        s = min(1.0, ROI_FACE / max(1, min(w, h)))
+        if s < 1.0:
+            roi = cv2.resize(roi, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+        if _YUNET is not None:
+            hits = yunet_boxes(_YUNET, np.ascontiguousarray(roi))
+        else:
+            side = max(20, int(min(w, h) * s * 0.6))
+            hits = _CASCADE.detectMultiScale(cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY),
+                                             scaleFactor=1.1, minNeighbors=5, minSize=(side, side))
+        if len(hits):
+            bx, by, bw, bh = max(hits, key=lambda b: b[2] * b[3])
+            found.append((x0 + int(bx / s), y0 + int(by / s), int(bw / s), int(bh / s)))
+    return found
+
+def detect_faces_fast(frame_bgr, detect_scale=1.0, track=True):
     """
-    Return a list of (x, y, w, h) for faces in a BGR frame.
+    Return a list of (x, y, w, h) for faces in a BGR frame (numpy or UMat).
+    Prefer numpy: the Haar pass uploads it to the device itself, while YuNet
+    and the ROI windows run on the host and would have to download a UMat.
     Works fast enough for a mirror. Returns [] if none.
+    Uses YuNet when available (detect_scale is then ignored; it always runs
+    at YUNET_WIDTH). For the Haar fallback the cascade runs on a copy
+    downscaled by detect_scale, and to at most DETECT_WIDTH on the long side
+    (Haar cost is linear in pixels).
+    With track=True only every DETECT_EVERY-th call is a full pass; the ones
+    in between re-find the previous faces in small windows. Pass track=False
+    for frames that are not from one continuous video stream.
+    Boxes are always returned in full-frame coordinates.
     """
+    global _LAST_BOXES, _FRAME_IDX
     if frame_bgr is None:
         return []
     try:
-        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-        # Slightly larger minSize reduces false positives
-        faces = _CASCADE.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(80, 80),
-            flags=cv2.CASCADE_SCALE_IMAGE,
-        )
-        return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in faces]
+        _FRAME_IDX += 1
+        if track and _LAST_BOXES and _FRAME_IDX % DETECT_EVERY:
+            boxes = _redetect_rois(frame_bgr, _LAST_BOXES)
+            if boxes:
+                _LAST_BOXES = boxes
+                return boxes
+            # every face lost: fall through to a full pass right away
+        if _YUNET is not None:
+            boxes = _detect_yunet(frame_bgr)
+        else:
+            scale = float(detect_scale) if 0 < detect_scale < 1.0 else 1.0
+            if not isinstance(frame_bgr, cv2.UMat):  # a UMat has no cheap .shape
+                scale = min(scale, DETECT_WIDTH / max(frame_bgr.shape[:2]))
+            boxes = _detect_haar(frame_bgr, scale)
+        if track:
+            _LAST_BOXES = boxes
+        return boxes
     except Exception:
         return []
@@ -1,39 +1,65 @@
 # utils/voice.py
+import queue
+import threading
 import time
 import speech_recognition as sr
 
+from .stt import recognize
+
 # Set this to the working mic index (or leave None to use OS default).
 PREFERRED_IDX = None  # e.g. 8
 
+CHUNK_SIZE = 1024  # frames per PyAudio read; small buffers end phrases sooner
+
+# One recognizer per mic index, calibrated once per process (not per utterance)
+_RECOGNIZERS = {}
+
 def _make_mic(idx=None):
     """Create an sr.Microphone safely for the chosen index."""
     if idx is None:
-        return sr.Microphone()
-    return sr.Microphone(device_index=idx)
+        return sr.Microphone(chunk_size=CHUNK_SIZE)
+    return sr.Microphone(device_index=idx, chunk_size=CHUNK_SIZE)
+
+def _recognizer_for(idx=None, source=None):
+    r = _RECOGNIZERS.get(idx)
+    if r is not None:
+        return r
+    r = sr.Recognizer()
+    # keep energy threshold reasonable; it keeps adapting after calibration
+    r.dynamic_energy_threshold = True
+    r.pause_threshold = 0.6
+    try:
+        if source is not None:
+            r.adjust_for_ambient_noise(source, duration=0.6)
+        else:
+            with _make_mic(idx) as src:
+                r.adjust_for_ambient_noise(src, duration=0.6)
+    except Exception:
+        # not fatal; the default threshold still works
+        pass
+    _RECOGNIZERS[idx] = r
+    return r
+
+def calibrate(idx=None):
+    """Measure ambient noise once up front so the first listen isn't delayed."""
+    try:
+        _recognizer_for(idx)
+    except Exception as e:
+        print(f"[VOICE] Calibration skipped: {e}")
 
 def try_listen(idx=None, culture="en-US", timeout=6.0, phrase_time_limit=6.0):
     """
     One-shot listen; returns recognized text or None.
     Prints friendly diagnostics but never raises.
     """
-    r = sr.Recognizer()
-    # keep energy threshold reasonable and adapt briefly
-    r.dynamic_energy_threshold = True
-    r.pause_threshold = 0.6
-
     try:
         with _make_mic(idx) as source:
+            r = _recognizer_for(idx, source)
             print("[VOICE] Say something! (Speak clearly for ~5 seconds...)")
-            try:
-                r.adjust_for_ambient_noise(source, duration=0.3)
-            except Exception:
-                # not fatal; continue
-                pass
-
             audio = r.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
 
-        # recognition (Google Speech recognizer; swap if you use another)
-        text = r.recognize_google(audio, language=culture)
+        # recognition engine is picked by AI_MIRROR_STT (see utils/stt.py)
+        text = recognize(r, audio, language=culture)
         print(f"[VOICE] Recognized: {text}")
         return text
 
@@ -50,3 +76,57 @@ def try_listen(idx=None, culture="en-US", timeout=6.0, phrase_time_limit=6.0):
         print(f"[VOICE] Unexpected error: {e}")
 
     return None
+
+class VoiceRecognizer:
+    """
+    Continuous listener: a daemon thread keeps the mic stream open (no
+    PortAudio open or calibration per utterance) and queues every recognized
+    phrase. get() polls the queue, so callers never block on audio I/O.
+    """
+
+    def __init__(self, idx=None, culture="en-US", phrase_time_limit=6.0):
+        self.idx = idx
+        self.culture = culture
+        self.phrase_time_limit = phrase_time_limit
+        self._q = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+
+    def _run(self):
+        try:
+            with _make_mic(self.idx) as source:
+                r = _recognizer_for(self.idx, source)
+                while not self._stop.is_set():
+                    try:
+                        # short timeout so stop() is noticed between phrases
+                        audio = r.listen(source, timeout=1.0, phrase_time_limit=self.phrase_time_limit)
+                        text = recognize(r, audio, language=self.culture)
+                    except (sr.WaitTimeoutError, sr.UnknownValueError):
+                        continue
+                    except sr.RequestError as e:
+                        print(f"[VOICE] Recognition service error: {e}")
+                        continue
+                    except Exception as e:
+                        # engine/decode failure: keep listening, but don't spin on a persistent one
+                        print(f"[VOICE] Recognition error: {e}")
+                        self._stop.wait(0.5)
+                        continue
+                    if text and not self._stop.is_set():
+                        self._q.put(text)
+        except OSError as e:
+            # opening the mic failed: wrong device index or device busy
+            print(f"[VOICE] Mic error: {e}")
+        except Exception as e:
+            print(f"[VOICE] Unexpected error: {e}")
+
+    def get(self, timeout=None):
+        """Next recognized phrase, or None if nothing arrives within timeout."""
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._t.join(timeout=timeout)
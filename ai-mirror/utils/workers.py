@@ -0,0 +1,136 @@
+# utils/workers.py
+# Background producers for the mirror loops:
+#   CameraThread  – keeps grabbing frames, exposes only the newest one
+#   VoiceThread   – keeps listening, pushes recognized text onto a queue
+# The main thread consumes both without blocking and owns all GUI calls.
+
+from __future__ import annotations
+
+import contextlib
+import queue
+import threading
+import time
+
+
+class CameraThread(threading.Thread):
+    """
+    Keep the camera's driver queue drained and expose only the latest frame.
+    Every frame is grab()bed (cheap), but retrieve() – the actual decode – only
+    runs when the consumer has taken the previous frame or the one we hold is
+    older than `max_age` seconds, so no time is spent decoding frames nobody sees.
+    """
+
+    def __init__(self, cap, stop_event: threading.Event | None = None, max_age: float = 0.1):
+        super().__init__(name="camera", daemon=True)
+        self.cap = cap
+        self.stop_event = stop_event or threading.Event()
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.latest = None
+        self._fresh = False
+        self._stamp = 0.0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                ok = self.cap.grab()
+            except Exception:
+                ok = False
+            if not ok:
+                time.sleep(0.01)
+                continue
+
+            now = time.monotonic()
+            with self._lock:
+                wanted = not self._fresh or now - self._stamp > self.max_age
+            if not wanted:
+                continue
+
+            try:
+                ok, frame = self.cap.retrieve()
+            except Exception:
+                ok, frame = False, None
+            if not ok or frame is None:
+                continue
+            with self._lock:
+                self.latest = frame
+                self._fresh = True
+                self._stamp = now
+
+    def get_latest(self):
+        """Return the newest frame not yet handed out, or None if nothing new."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._fresh = False
+            return self.latest
+
+
+class VoiceThread(threading.Thread):
+    """
+    Call `listen()` in a loop and put every recognized string on `audio_q`.
+    When the queue is full the oldest utterance is dropped so the newest wins.
+    """
+
+    def __init__(self, listen, audio_q: queue.Queue, stop_event: threading.Event | None = None):
+        super().__init__(name="voice", daemon=True)
+        self.listen = listen
+        self.audio_q = audio_q
+        self.stop_event = stop_event or threading.Event()
+        self._lock = threading.Lock()
+        self._holds = 0
+        self._generation = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.is_paused():
+                self.stop_event.wait(0.05)
+                continue
+
+            gen = self._generation
+            try:
+                text = self.listen()
+            except Exception:
+                text = None
+
+            if self.stop_event.is_set():
+                break
+            if not text:
+                # avoid spinning when no voice engine is available
+                self.stop_event.wait(0.1)
+                continue
+            if gen != self._generation or self.is_paused():
+                # captured while the mirror was talking – probably our own voice
+                continue
+            self._put(text)
+
+    def _put(self, text: str) -> None:
+        try:
+            self.audio_q.put_nowait(text)
+        except queue.Full:
+            with contextlib.suppress(queue.Empty):
+                self.audio_q.get_nowait()
+            with contextlib.suppress(queue.Full):
+                self.audio_q.put_nowait(text)
+
+    def pause(self) -> None:
+        """Ignore the mic until a matching resume() (calls may nest)."""
+        with self._lock:
+            self._holds += 1
+            self._generation += 1
+
+    def resume(self) -> None:
+        with self._lock:
+            self._holds = max(0, self._holds - 1)
+
+    def is_paused(self) -> bool:
+        return self._holds > 0
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Ignore the mic while the body runs (e.g. while speaking a reply)."""
+        self.pause()
+        try:
+            yield
+        finally:
+            self.resume()